@@ -4,13 +4,14 @@ E-Ink Gallery Management Service
 REST API with web interface for managing images on e-ink displays
 """
 
+import asyncio
 import os
 import sys
+import tempfile
 import logging
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from functools import partial
 
 # Ensure /app is in the path for module imports
 sys.path.insert(0, "/app")
@@ -18,7 +19,12 @@ sys.path.insert(0, "/app")
 from aiohttp import web
 from aiohttp.web_runner import TCPSite
 import aiofiles
-import mimetypes
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 # Import local modules
 from display_config_manager import DisplayConfigManager
@@ -44,6 +50,20 @@ METADATA_DB_FILE = DATA_DIR / "metadata.db"
 # Display config manager
 display_config_manager = None
 
+# Extensions accepted as gallery images
+_VALID_EXTS = frozenset((".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"))
+
+# Content types for the valid extensions; a static map avoids the
+# mimetypes database lookup on every image fetch
+_CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".webp": "image/webp",
+}
+
 
 class GalleryManager:
     """Manages the eink art gallery"""
@@ -54,6 +74,21 @@ class GalleryManager:
         self.images_dir.mkdir(parents=True, exist_ok=True)
         # Initialize metadata database
         self.metadata_db = MetadataDatabase(METADATA_DB_FILE)
+        # Cached get_images() result, keyed by the directory mtime
+        self._cache = None
+        self._cache_mtime = -1
+        # Basename -> filename index, rebuilt lazily on directory mtime change
+        self._basename_index = {}
+        self._index_mtime = -1
+        # Lowercase tag name -> set of indices into the cached listing,
+        # rebuilt together with it
+        self.tag_index = {}
+        # Memoized filter_images_by_tags results per requested tag set;
+        # slideshows ask for the same filtered list on every advance
+        self._filter_cache = {}
+        # Bumped on every mutation; consumers (e.g. the eink render cache)
+        # fold it into their keys so stale entries become misses
+        self.version = 0
 
     def find_image_by_basename(self, basename: str) -> Optional[str]:
         """Find image file by basename (without extension).
@@ -64,84 +99,207 @@ class GalleryManager:
         Returns:
             Full filename if found (e.g., 'photo.jpg'), None otherwise
         """
-        for file_path in self.images_dir.glob("*"):
-            if file_path.is_file() and self._is_image(file_path):
-                if file_path.stem == basename:  # Compare without extension
-                    return file_path.name
-        return None
+        # Refresh the index only when the directory has actually changed,
+        # so the per-request lookup is a plain dict access.
+        mtime = os.stat(self.images_dir).st_mtime_ns
+        if mtime != self._index_mtime:
+            index = {}
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and self._is_image(
+                        entry.name
+                    ):
+                        index[entry.name.rpartition(".")[0]] = entry.name
+            self._basename_index = index
+            self._index_mtime = mtime
+        return self._basename_index.get(basename)
+
+    def invalidate_cache(self):
+        """Drop the cached directory listing after a gallery mutation"""
+        self._cache = None
+        self._cache_mtime = -1
+        self._index_mtime = -1
+        self._filter_cache = {}
+        self.version += 1
 
     def get_images(self) -> list:
         """Get list of all images with metadata"""
+        # Directory contents rarely change; reuse the cached listing until
+        # the directory mtime moves (uploads/deletes also invalidate it).
+        mtime = os.stat(self.images_dir).st_mtime_ns
+        if self._cache is not None and mtime == self._cache_mtime:
+            return self._cache
+
+        with os.scandir(self.images_dir) as it:
+            entries = [
+                e
+                for e in it
+                if not e.name.startswith(".")
+                and e.is_file(follow_symlinks=False)
+                and self._is_image(e.name)
+            ]
+
+        # One bulk query for all metadata instead of one query per file
+        meta_by_name = self.metadata_db.get_metadata_bulk([e.name for e in entries])
+
         images = []
-        for file_path in sorted(self.images_dir.glob("*")):
-            if file_path.name.startswith("."):
-                continue
-            if file_path.is_file() and self._is_image(file_path):
-                meta = self.metadata_db.get_image_metadata(file_path.name)
-                if meta:
-                    images.append(
-                        {
-                            "filename": file_path.name,
-                            "size": file_path.stat().st_size,
-                            "uploaded": meta.get(
-                                "uploaded_at",
-                                datetime.fromtimestamp(
-                                    file_path.stat().st_ctime
-                                ).isoformat(),
-                            ),
-                            "title": meta.get("title", ""),
-                            "description": meta.get("description", ""),
-                            "tags": meta.get("tags", []),
-                            "url": f"/api/images/{file_path.name}",
-                        }
-                    )
-                else:
-                    # Image exists but not in database, add it
-                    self.metadata_db.add_image(
-                        file_path.name,
-                        datetime.fromtimestamp(file_path.stat().st_ctime).isoformat(),
-                    )
-                    images.append(
-                        {
-                            "filename": file_path.name,
-                            "size": file_path.stat().st_size,
-                            "uploaded": datetime.fromtimestamp(
-                                file_path.stat().st_ctime
-                            ).isoformat(),
-                            "title": "",
-                            "description": "",
-                            "tags": [],
-                            "url": f"/api/images/{file_path.name}",
-                        }
-                    )
+        missing = []
+        for entry in entries:
+            # One stat per entry; DirEntry caches the result
+            st = entry.stat()
+            ctime_iso = datetime.fromtimestamp(st.st_ctime).isoformat()
+            meta = meta_by_name.get(entry.name)
+            if meta:
+                images.append(
+                    {
+                        "filename": entry.name,
+                        "size": st.st_size,
+                        "uploaded": meta.get("uploaded_at", ctime_iso),
+                        "title": meta.get("title", ""),
+                        "description": meta.get("description", ""),
+                        "tags": meta.get("tags", []),
+                        "url": f"/api/images/{entry.name}",
+                    }
+                )
+            else:
+                # Image exists but not in database, register it below
+                missing.append((entry.name, ctime_iso))
+                images.append(
+                    {
+                        "filename": entry.name,
+                        "size": st.st_size,
+                        "uploaded": ctime_iso,
+                        "title": "",
+                        "description": "",
+                        "tags": [],
+                        "url": f"/api/images/{entry.name}",
+                    }
+                )
+
+        # Insert all missing rows in a single transaction
+        if missing:
+            self.metadata_db.add_images_bulk(missing)
+
+        # Sort the final (image-only) list rather than the raw directory
+        # entries, which may include many non-image files
+        images.sort(key=lambda img: img["filename"])
+
+        # Index images by lowercase tag so filtering is a set union
+        # instead of a per-request scan over every image's tags. Tags
+        # always arrive from the metadata DB as {"tag_id", "name"} dicts,
+        # so no per-tag type dispatch is needed.
+        tag_index = {}
+        for i, img in enumerate(images):
+            for tag in img["tags"]:
+                tag_index.setdefault(tag["name"].lower(), set()).add(i)
+
+        self.tag_index = tag_index
+        self._filter_cache = {}
+        self._cache = images
+        self._cache_mtime = mtime
         return images
 
-    def _is_image(self, file_path: Path) -> bool:
-        """Check if file is a valid image"""
-        valid_extensions = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
-        return file_path.suffix.lower() in valid_extensions
+    def filter_images_by_tags(self, requested_tags) -> list:
+        """Get images carrying at least one of the requested tags.
 
-    async def upload_image(self, filename: str, data: bytes, title: str = "") -> bool:
-        """Upload an image file"""
-        if not self._is_image(Path(filename)):
-            raise ValueError("Invalid image format")
+        Args:
+            requested_tags: Iterable of lowercase tag names
 
-        file_path = self.images_dir / filename
-        try:
-            async with aiofiles.open(file_path, "wb") as f:
-                await f.write(data)
+        Returns:
+            List of image dicts, in listing order
+        """
+        images = self.get_images()  # also refreshes tag_index / memo
+
+        # Slideshow "next" calls refilter with the same tags on every
+        # advance; memoize the ordered result per tag set
+        key = tuple(sorted(set(requested_tags)))
+        cached = self._filter_cache.get(key)
+        if cached is not None:
+            return cached
 
-            # Add to metadata database
-            self.metadata_db.add_image(
-                filename, datetime.now().isoformat(), title=title
+        indices = set().union(
+            *(self.tag_index.get(tag, ()) for tag in requested_tags)
+        )
+        result = [images[i] for i in sorted(indices)]
+        self._filter_cache[key] = result
+        return result
+
+    def get_image_count(self) -> int:
+        """Count gallery images without touching the metadata database"""
+        if self._cache is not None:
+            return len(self._cache)
+        with os.scandir(self.images_dir) as it:
+            return sum(
+                1
+                for e in it
+                if not e.name.startswith(".")
+                and e.is_file(follow_symlinks=False)
+                and self._is_image(e.name)
             )
 
-            # Remove 'latest' tag from all other images
-            self.metadata_db.remove_tag_from_all_images("latest")
+    def _is_image(self, filename: str) -> bool:
+        """Check if filename has a valid image extension"""
+        i = filename.rfind(".")
+        return i != -1 and filename[i:].lower() in _VALID_EXTS
+
+    async def upload_image(self, filename: str, field, title: str = "") -> bool:
+        """Upload an image file, streaming the multipart field to disk.
+
+        Args:
+            filename: Target filename
+            field: aiohttp multipart field to read chunks from
+            title: Optional image title
+        """
+        if not self._is_image(filename):
+            raise ValueError("Invalid image format")
 
-            # Add 'latest' tag to the newly uploaded image
-            self.metadata_db.add_tag(filename, "latest")
+        file_path = self.images_dir / filename
+        # Stream into a unique temp file and publish with os.replace (same
+        # atomic idiom as _atomic_write): a client abort or mid-stream error
+        # must not leave a truncated image that the next directory scan
+        # would register and serve to panels. The .tmp suffix keeps the
+        # partial file invisible to _is_image while it is being written.
+        fd, tmp_name = tempfile.mkstemp(dir=self.images_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            # Stream in chunks so memory use is bounded regardless of file size
+            async with aiofiles.open(tmp_name, "wb") as f:
+                while True:
+                    chunk = await field.read_chunk(65536)
+                    if not chunk:
+                        break
+                    await f.write(chunk)
+            os.replace(tmp_name, file_path)
+        except Exception as e:
+            logger.error(f"Failed to upload image: {e}")
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
 
+        try:
+            # Register in the metadata database off the event loop; one
+            # thread hop covers all three blocking SQLite commits
+            def _register_upload():
+                self.metadata_db.add_image(
+                    filename, datetime.now().isoformat(), title=title
+                )
+                # Move the 'latest' tag from its tracked holder to the new
+                # image; only one row is touched instead of the whole table
+                old = self.metadata_db.get_singleton_tag_owner("latest")
+                if old and old != filename:
+                    self.metadata_db.remove_tag(old, "latest")
+                elif old is None:
+                    # Databases from before the owner was tracked may still
+                    # have an untracked holder; clear the old way once
+                    self.metadata_db.remove_tag_from_all_images("latest")
+                self.metadata_db.add_tag(filename, "latest")
+                self.metadata_db.set_singleton_tag_owner("latest", filename)
+
+            await asyncio.to_thread(_register_upload)
+
+            self.invalidate_cache()
             logger.info(f"Image uploaded: {filename}")
             return True
         except Exception as e:
@@ -156,8 +314,9 @@ class GalleryManager:
 
         try:
             file_path.unlink()
-            # Remove from metadata database
-            self.metadata_db.remove_image(filename)
+            # Remove from metadata database without blocking the loop
+            await asyncio.to_thread(self.metadata_db.remove_image, filename)
+            self.invalidate_cache()
             logger.info(f"Image deleted: {filename}")
             return True
         except Exception as e:
@@ -171,8 +330,9 @@ class GalleryManager:
             raise FileNotFoundError(f"Image not found: {filename}")
 
         try:
-            async with aiofiles.open(file_path, "rb") as f:
-                return await f.read()
+            # One executor hop for the whole read instead of separate
+            # open/read/close dispatches through aiofiles
+            return await asyncio.to_thread(file_path.read_bytes)
         except Exception as e:
             logger.error(f"Failed to read image: {e}")
             raise
@@ -182,26 +342,44 @@ class GalleryManager:
 gallery = None
 
 
+def _json(data, status: int = 200) -> web.Response:
+    """Build a JSON response with orjson when available.
+
+    orjson serializes several times faster than the stdlib json used by
+    web.json_response and emits bytes directly, which matters for the
+    large /api/images payloads.
+    """
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data).encode("utf-8")
+    response = web.Response(
+        body=body, status=status, content_type="application/json"
+    )
+    # The list payloads are highly repetitive; compress anything big
+    # enough for the bandwidth save to beat the encode cost. aiohttp
+    # negotiates against the request's Accept-Encoding.
+    if len(body) > 1024:
+        response.enable_compression()
+    return response
+
+
 async def handle_index(request: web.Request) -> web.Response:
-    """Serve the web interface"""
-    html_file = Path(__file__).parent / "templates" / "index.html"
-    try:
-        with open(html_file, "r") as f:
-            html = f.read()
-        return web.Response(text=html, content_type="text/html")
-    except Exception as e:
-        logger.error(f"Failed to load index.html: {e}")
+    """Serve the web interface from the copy cached at startup"""
+    html = request.app.get("index_html")
+    if html is None:
         return web.Response(text="Error loading interface", status=500)
+    return web.Response(body=html, content_type="text/html")
 
 
 async def api_get_images(request: web.Request) -> web.Response:
     """GET /api/images - Get list of all images"""
     try:
         images = gallery.get_images()
-        return web.json_response({"status": "success", "images": images})
+        return _json({"status": "success", "images": images})
     except Exception as e:
         logger.error(f"Error getting images: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_upload_image(request: web.Request) -> web.Response:
@@ -211,17 +389,16 @@ async def api_upload_image(request: web.Request) -> web.Response:
         field = await reader.next()
 
         if field.name != "file":
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": "Missing 'file' field"}, status=400
             )
 
         filename = field.filename
         title = request.rel_url.query.get("title", "")
 
-        data = await field.read()
-        await gallery.upload_image(filename, data, title)
+        await gallery.upload_image(filename, field, title)
 
-        return web.json_response(
+        return _json(
             {
                 "status": "success",
                 "message": f"Image '{filename}' uploaded successfully",
@@ -229,10 +406,10 @@ async def api_upload_image(request: web.Request) -> web.Response:
             }
         )
     except ValueError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=400)
+        return _json({"status": "error", "message": str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error uploading image: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_delete_image(request: web.Request) -> web.Response:
@@ -246,14 +423,14 @@ async def api_delete_image(request: web.Request) -> web.Response:
             filename = basename
 
         await gallery.delete_image(filename)
-        return web.json_response(
+        return _json(
             {"status": "success", "message": f"Image '{filename}' deleted successfully"}
         )
     except FileNotFoundError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=404)
+        return _json({"status": "error", "message": str(e)}, status=404)
     except Exception as e:
         logger.error(f"Error deleting image: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_get_image(request: web.Request) -> web.Response:
@@ -266,40 +443,48 @@ async def api_get_image(request: web.Request) -> web.Response:
             # If not found by basename, try as full filename
             filename = basename
 
-        data = await gallery.get_image(filename)
-
-        # Determine content type
         file_path = gallery.images_dir / filename
-        content_type, _ = mimetypes.guess_type(str(file_path))
-        if not content_type:
-            content_type = "application/octet-stream"
+        if not file_path.is_file():
+            raise FileNotFoundError(f"Image not found: {filename}")
 
-        return web.Response(body=data, content_type=content_type)
+        # Determine content type
+        ext = filename[filename.rfind(".") :].lower()
+        content_type = _CONTENT_TYPES.get(ext, "application/octet-stream")
+
+        # FileResponse serves via sendfile, avoiding a userspace copy, and
+        # handles ETag/If-None-Match itself — repeated polls of an
+        # unchanged image finish with an empty 304
+        return web.FileResponse(
+            path=file_path,
+            headers={
+                "Content-Type": content_type,
+                "Cache-Control": "public, max-age=86400",
+            },
+        )
     except FileNotFoundError:
-        return web.json_response(
+        return _json(
             {"status": "error", "message": f"Image not found: {basename}"}, status=404
         )
     except Exception as e:
         logger.error(f"Error getting image: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_get_status(request: web.Request) -> web.Response:
     """GET /api/status - Get gallery status"""
     try:
-        images = gallery.get_images()
-        return web.json_response(
+        return _json(
             {
                 "status": "success",
                 "running": True,
                 "port": gallery.port,
-                "total_images": len(images),
+                "total_images": gallery.get_image_count(),
                 "data_dir": str(gallery.images_dir),
             }
         )
     except Exception as e:
         logger.error(f"Error getting status: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_get_image_metadata(request: web.Request) -> web.Response:
@@ -313,15 +498,15 @@ async def api_get_image_metadata(request: web.Request) -> web.Response:
 
         meta = gallery.metadata_db.get_image_metadata(filename)
         if not meta:
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": f"Image not found: {filename}"},
                 status=404,
             )
 
-        return web.json_response({"status": "success", "metadata": meta})
+        return _json({"status": "success", "metadata": meta})
     except Exception as e:
         logger.error(f"Error getting image metadata: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_update_image_metadata(request: web.Request) -> web.Response:
@@ -338,7 +523,7 @@ async def api_update_image_metadata(request: web.Request) -> web.Response:
         description = data.get("description")
 
         if not gallery.metadata_db.update_image_metadata(filename, title, description):
-            return web.json_response(
+            return _json(
                 {
                     "status": "error",
                     "message": f"Failed to update metadata for {filename}",
@@ -346,8 +531,11 @@ async def api_update_image_metadata(request: web.Request) -> web.Response:
                 status=500,
             )
 
+        # Cached listings embed title/description, so drop them
+        gallery.invalidate_cache()
+
         meta = gallery.metadata_db.get_image_metadata(filename)
-        return web.json_response(
+        return _json(
             {
                 "status": "success",
                 "message": "Metadata updated successfully",
@@ -356,7 +544,7 @@ async def api_update_image_metadata(request: web.Request) -> web.Response:
         )
     except Exception as e:
         logger.error(f"Error updating image metadata: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_add_tag(request: web.Request) -> web.Response:
@@ -372,18 +560,21 @@ async def api_add_tag(request: web.Request) -> web.Response:
         tag_name = data.get("tag")
 
         if not tag_name:
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": "Missing 'tag' field"}, status=400
             )
 
         if not gallery.metadata_db.add_tag(filename, tag_name):
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": f"Failed to add tag to {filename}"},
                 status=500,
             )
 
+        # Cached listings embed tags, so drop them
+        gallery.invalidate_cache()
+
         meta = gallery.metadata_db.get_image_metadata(filename)
-        return web.json_response(
+        return _json(
             {
                 "status": "success",
                 "message": f"Tag '{tag_name}' added successfully",
@@ -392,7 +583,7 @@ async def api_add_tag(request: web.Request) -> web.Response:
         )
     except Exception as e:
         logger.error(f"Error adding tag: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_remove_tag(request: web.Request) -> web.Response:
@@ -407,13 +598,16 @@ async def api_remove_tag(request: web.Request) -> web.Response:
             filename = basename
 
         if not gallery.metadata_db.remove_tag(filename, tag_name):
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": f"Failed to remove tag from {filename}"},
                 status=500,
             )
 
+        # Cached listings embed tags, so drop them
+        gallery.invalidate_cache()
+
         meta = gallery.metadata_db.get_image_metadata(filename)
-        return web.json_response(
+        return _json(
             {
                 "status": "success",
                 "message": f"Tag '{tag_name}' removed successfully",
@@ -422,17 +616,17 @@ async def api_remove_tag(request: web.Request) -> web.Response:
         )
     except Exception as e:
         logger.error(f"Error removing tag: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_get_all_tags(request: web.Request) -> web.Response:
     """GET /api/tags - Get all available tags"""
     try:
         tags = gallery.metadata_db.get_all_tags()
-        return web.json_response({"status": "success", "tags": tags})
+        return _json({"status": "success", "tags": tags})
     except Exception as e:
         logger.error(f"Error getting all tags: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 # Display Configuration Management Endpoints
@@ -442,10 +636,10 @@ async def api_list_displays(request: web.Request) -> web.Response:
     """GET /api/displays - List all available displays"""
     try:
         displays = display_config_manager.list_displays()
-        return web.json_response({"status": "success", "displays": displays})
+        return _json({"status": "success", "displays": displays})
     except Exception as e:
         logger.error(f"Error listing displays: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_get_display_config(request: web.Request) -> web.Response:
@@ -454,14 +648,14 @@ async def api_get_display_config(request: web.Request) -> web.Response:
         display_name = request.match_info.get("display_name")
         content = display_config_manager.load_display_config(display_name)
 
-        return web.json_response(
+        return _json(
             {"status": "success", "display_name": display_name, "content": content}
         )
     except FileNotFoundError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=404)
+        return _json({"status": "error", "message": str(e)}, status=404)
     except Exception as e:
         logger.error(f"Error getting display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_save_display_config(request: web.Request) -> web.Response:
@@ -472,17 +666,17 @@ async def api_save_display_config(request: web.Request) -> web.Response:
         yaml_content = data.get("content", "")
 
         if not yaml_content:
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": "Missing 'content' field"}, status=400
             )
 
         result = display_config_manager.save_display_config(display_name, yaml_content)
-        return web.json_response(result)
+        return _json(result)
     except ValueError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=400)
+        return _json({"status": "error", "message": str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error saving display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_reset_display_config(request: web.Request) -> web.Response:
@@ -490,12 +684,12 @@ async def api_reset_display_config(request: web.Request) -> web.Response:
     try:
         display_name = request.match_info.get("display_name")
         result = display_config_manager.reset_display_config(display_name)
-        return web.json_response(result)
+        return _json(result)
     except FileNotFoundError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=404)
+        return _json({"status": "error", "message": str(e)}, status=404)
     except Exception as e:
         logger.error(f"Error resetting display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_duplicate_display_config(request: web.Request) -> web.Response:
@@ -506,17 +700,17 @@ async def api_duplicate_display_config(request: web.Request) -> web.Response:
         new_name = data.get("new_name", "")
 
         if not new_name:
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": "Missing 'new_name' field"}, status=400
             )
 
         result = display_config_manager.duplicate_display_config(source_name, new_name)
-        return web.json_response(result)
+        return _json(result)
     except (FileNotFoundError, ValueError) as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=400)
+        return _json({"status": "error", "message": str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error duplicating display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_delete_display_config(request: web.Request) -> web.Response:
@@ -524,12 +718,12 @@ async def api_delete_display_config(request: web.Request) -> web.Response:
     try:
         display_name = request.match_info.get("display_name")
         result = display_config_manager.delete_display_config(display_name)
-        return web.json_response(result)
+        return _json(result)
     except FileNotFoundError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=404)
+        return _json({"status": "error", "message": str(e)}, status=404)
     except Exception as e:
         logger.error(f"Error deleting display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_export_display_config(request: web.Request) -> web.Response:
@@ -544,10 +738,10 @@ async def api_export_display_config(request: web.Request) -> web.Response:
             headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
     except FileNotFoundError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=404)
+        return _json({"status": "error", "message": str(e)}, status=404)
     except Exception as e:
         logger.error(f"Error exporting display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
 
 
 async def api_import_display_config(request: web.Request) -> web.Response:
@@ -558,13 +752,24 @@ async def api_import_display_config(request: web.Request) -> web.Response:
         filename = None
         content = None
 
+        # Display configs are tiny; refuse anything unreasonably large
+        max_size = 1024 * 1024
+
         async for field in reader:
             if field.name == "file":
                 filename = field.filename
-                content = (await field.read()).decode("utf-8")
+                buf = bytearray()
+                while True:
+                    chunk = await field.read_chunk(65536)
+                    if not chunk:
+                        break
+                    buf.extend(chunk)
+                    if len(buf) > max_size:
+                        raise ValueError("Config file too large (max 1 MiB)")
+                content = buf.decode("utf-8")
 
         if not filename or not content:
-            return web.json_response(
+            return _json(
                 {"status": "error", "message": "Missing 'file' field"}, status=400
             )
 
@@ -576,61 +781,88 @@ async def api_import_display_config(request: web.Request) -> web.Response:
         result = display_config_manager.import_display_config(
             filename, content, overwrite=overwrite
         )
-        return web.json_response(result)
+        return _json(result)
     except FileExistsError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=409)
+        return _json({"status": "error", "message": str(e)}, status=409)
     except ValueError as e:
-        return web.json_response({"status": "error", "message": str(e)}, status=400)
+        return _json({"status": "error", "message": str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error importing display config: {e}")
-        return web.json_response({"status": "error", "message": str(e)}, status=500)
+        return _json({"status": "error", "message": str(e)}, status=500)
+
+
+# Single dispatch table for the per-display sub-routes; one parameterized
+# resource keeps the router trie small instead of one resource per action
+_DISPLAY_ACTIONS = {
+    "config": {"GET": api_get_display_config, "PUT": api_save_display_config},
+    "reset": {"POST": api_reset_display_config},
+    "duplicate": {"POST": api_duplicate_display_config},
+    "export": {"GET": api_export_display_config},
+}
+
+
+async def api_display_action(request: web.Request) -> web.Response:
+    """Dispatch /api/displays/{display_name}/{action} to the action handler"""
+    action = request.match_info.get("action")
+    handlers = _DISPLAY_ACTIONS.get(action)
+    if not handlers:
+        return _json(
+            {"status": "error", "message": f"Unknown action: {action}"}, status=404
+        )
+    handler = handlers.get(request.method)
+    if not handler:
+        return _json(
+            {"status": "error", "message": f"Method not allowed for '{action}'"},
+            status=405,
+        )
+    return await handler(request)
+
+
+# Frozen route table, registered in a single add_routes pass.
+# Note: literal paths must precede parameterized paths at the same level
+# (upload before {filename}, eink/random and eink/next before
+# eink/{filename}) so aiohttp matches them first.
+ROUTES = [
+    web.get("/", handle_index),
+    web.get("/api/status", api_get_status),
+    web.get("/api/images", api_get_images),
+    web.post("/api/images/upload", api_upload_image),
+    # E-ink processing routes
+    web.get("/api/images/eink/random", api_get_random_eink_image),
+    web.get("/api/images/eink/next", api_get_next_eink_image),
+    web.get("/api/images/eink/{filename}", api_get_eink_image),
+    # Generic image routes
+    web.get("/api/images/{filename}", api_get_image),
+    web.delete("/api/images/{filename}", api_delete_image),
+    # Metadata routes
+    web.get("/api/metadata/{filename}", api_get_image_metadata),
+    web.put("/api/metadata/{filename}", api_update_image_metadata),
+    web.post("/api/metadata/{filename}/tags", api_add_tag),
+    web.delete("/api/metadata/{filename}/tags/{tag_name}", api_remove_tag),
+    web.get("/api/tags", api_get_all_tags),
+    # Display configuration routes; per-display actions share one resource
+    web.get("/api/displays", api_list_displays),
+    web.post("/api/displays/import", api_import_display_config),
+    web.delete("/api/displays/{display_name}", api_delete_display_config),
+    web.route("*", "/api/displays/{display_name}/{action}", api_display_action),
+]
 
 
 async def create_app(port: int = 8112) -> web.Application:
     """Create and configure the aiohttp application"""
     app = web.Application()
 
-    # Routes
-    app.router.add_get("/", handle_index)
-    app.router.add_get("/api/status", api_get_status)
-    app.router.add_get("/api/images", api_get_images)
-    app.router.add_post("/api/images/upload", api_upload_image)
-
-    # Create eink resource to handle sub-routes in correct order
-    # Note: In aiohttp, literal paths and parameterized paths at same level have conflicts
-    # We need to register them with explicit resource handling
-    eink_res = app.router.add_resource("/api/images/eink/random")
-    eink_res.add_route("GET", partial(api_get_random_eink_image, gallery))
-
-    eink_next_res = app.router.add_resource("/api/images/eink/next")
-    eink_next_res.add_route("GET", partial(api_get_next_eink_image, gallery))
+    # Make the gallery available to handlers in other modules
+    app["gallery"] = gallery
 
-    eink_file_res = app.router.add_resource("/api/images/eink/{filename}")
-    eink_file_res.add_route("GET", partial(api_get_eink_image, gallery))
-
-    # Generic image routes
-    img_res = app.router.add_resource("/api/images/{filename}")
-    img_res.add_route("GET", api_get_image)
-    img_res.add_route("DELETE", api_delete_image)
+    # Cache the web interface in memory so "/" never touches the disk
+    try:
+        html_file = Path(__file__).parent / "templates" / "index.html"
+        app["index_html"] = html_file.read_bytes()
+    except Exception as e:
+        logger.error(f"Failed to load index.html: {e}")
 
-    # Metadata routes
-    app.router.add_get("/api/metadata/{filename}", api_get_image_metadata)
-    app.router.add_put("/api/metadata/{filename}", api_update_image_metadata)
-    app.router.add_post("/api/metadata/{filename}/tags", api_add_tag)
-    app.router.add_delete("/api/metadata/{filename}/tags/{tag_name}", api_remove_tag)
-    app.router.add_get("/api/tags", api_get_all_tags)
-
-    # Display configuration routes
-    app.router.add_get("/api/displays", api_list_displays)
-    app.router.add_get("/api/displays/{display_name}/config", api_get_display_config)
-    app.router.add_put("/api/displays/{display_name}/config", api_save_display_config)
-    app.router.add_post("/api/displays/{display_name}/reset", api_reset_display_config)
-    app.router.add_post(
-        "/api/displays/{display_name}/duplicate", api_duplicate_display_config
-    )
-    app.router.add_delete("/api/displays/{display_name}", api_delete_display_config)
-    app.router.add_get("/api/displays/{display_name}/export", api_export_display_config)
-    app.router.add_post("/api/displays/import", api_import_display_config)
+    app.add_routes(ROUTES)
 
     # Serve static files (CSS, JS, etc.)
     static_path = Path(__file__).parent / "static"
@@ -689,9 +921,16 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     import signal
 
+    # uvloop is a drop-in, notably faster event loop on Linux
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
     async def signal_handler(sig, frame):
         """Handle shutdown signals gracefully"""
         logger.info(f"Received signal {sig}, shutting down...")
@@ -3,11 +3,41 @@ Display Configuration Loader
 Provides functions to load and parse eink display configuration files.
 """
 
+import functools
+import os
+import pickle
+
+import numpy as np
 import yaml
 from pathlib import Path
 from typing import Dict, Tuple, List
 from PIL import Image
 
+# Prefer the libyaml-backed loader; it parses an order of magnitude
+# faster than the pure-Python SafeLoader and raises the same errors
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+# Config directories; built once instead of per call
+_DEFAULT_DISPLAYS_DIR = Path(__file__).resolve().parent / "displays"
+_PERSISTENT_DIR = Path("/data/eink_art/displays")
+
+
+def invalidate_config_cache(path: Path = None):
+    """Drop cached parsed configs.
+
+    Configs change rarely (user saves), so a full cache_clear is O(1)
+    and simpler than per-path eviction. The path argument is accepted
+    for caller convenience but unused.
+
+    Args:
+        path: Path of the config file that changed
+    """
+    _load_config_cached.cache_clear()
+
 
 class DisplayConfig:
     """Represents an e-ink display configuration."""
@@ -49,47 +79,106 @@ class DisplayConfig:
         """
         return (self.resolution["width"], self.resolution["height"])
 
-    def get_palette_image(self) -> Image.Image:
+    @functools.cached_property
+    def palette_array(self) -> np.ndarray:
         """
-        Create a PIL Image with the configured color palette.
+        The configured palette as a validated uint8 (k, 3) array.
 
-        Returns:
-            A 1x1 PIL Image in palette mode with the configured colors
+        NumPy checks shape and element types in one C-level conversion;
+        ragged or non-numeric palettes surface as a single clean error.
+        Converted via an int array first because a direct uint8 cast
+        silently wraps out-of-range channels (300 becomes 44) instead of
+        failing like putpalette did.
         """
         palette = self.color_mapping["palette"]
+        try:
+            arr = np.asarray(palette, dtype=np.int64)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid palette: {palette}. Expected [R, G, B] colors")
+        if arr.ndim != 2 or arr.shape[1] != 3:
+            raise ValueError(f"Invalid palette: {palette}. Expected [R, G, B] colors")
+        if not ((arr >= 0) & (arr <= 255)).all():
+            raise ValueError(
+                f"Invalid palette: {palette}. Channel values must be in range(0, 256)"
+            )
+        return arr.astype(np.uint8)
 
-        # Flatten the RGB colors into a single list
-        palette_data = []
-        for color in palette:
-            if isinstance(color, (list, tuple)) and len(color) == 3:
-                palette_data.extend(color)
-            else:
-                raise ValueError(f"Invalid color format: {color}. Expected [R, G, B]")
+    @functools.cached_property
+    def palette_image(self) -> Image.Image:
+        """
+        A 1x1 PIL Image in palette mode with the configured colors.
+
+        Built once per config; the palette never changes after parsing.
+        """
+        arr = self.palette_array
 
         # Pad to 768 entries (256 colors * 3 channels)
-        while len(palette_data) < 768:
-            palette_data.append(0)
+        buf = np.zeros(768, dtype=np.uint8)
+        buf[: arr.size] = arr.ravel()
 
         # Create and return palette image
         p_image = Image.new("P", (1, 1))
-        p_image.putpalette(palette_data)
+        p_image.putpalette(buf.tobytes())
         return p_image
 
-    def to_process_image_params(self) -> Dict:
+    @functools.cached_property
+    def rgb_to_index_lut(self) -> np.ndarray:
         """
-        Convert the configuration to parameters for the process_image() function.
+        A uint8[32, 32, 32] table mapping RGB to the nearest palette index.
+
+        Indexed as lut[r >> 3, g >> 3, b >> 3], so a pixel maps to its
+        palette entry with one gather instead of a distance search over
+        the palette. Built once per config (32 KiB).
+        """
+        # int32: squared channel distances reach 255**2 and would overflow int16
+        palette = self.palette_array.astype(np.int32)
+
+        # Sample each channel at the center of its 8-wide bin
+        levels = np.arange(4, 256, 8, dtype=np.int32)
+        grid = np.stack(
+            np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1
+        ).reshape(-1, 3)
+
+        # Squared distance from every grid point to every palette color
+        dists = ((grid[:, None, :] - palette[None, :, :]) ** 2).sum(-1)
+        return dists.argmin(1).astype(np.uint8).reshape(32, 32, 32)
+
+    def get_palette_image(self) -> Image.Image:
+        """
+        Get the PIL Image with the configured color palette.
 
         Returns:
-            Dictionary with keys: width, height, palette_image, gamma
+            A 1x1 PIL Image in palette mode with the configured colors
         """
+        return self.palette_image
+
+    @functools.cached_property
+    def _process_image_params(self) -> Dict:
         width, height = self.get_resolution()
         return {
             "width": width,
             "height": height,
-            "palette_image": self.get_palette_image(),
+            "palette_image": self.palette_image,
             "gamma": self.gamma,
+            "palette_array": self.palette_array,
+            "rgb_to_index_lut": self.rgb_to_index_lut,
         }
 
+    def to_process_image_params(self) -> Dict:
+        """
+        Convert the configuration to parameters for the process_image() function.
+
+        Built once per config and shared — callers unpack it as keyword
+        arguments and must not mutate it. Includes the precomputed palette
+        array and nearest-index LUT so the compiled dither kernel can run
+        without rebuilding palette structures per image.
+
+        Returns:
+            Dictionary with keys: width, height, palette_image, gamma,
+            palette_array, rgb_to_index_lut
+        """
+        return self._process_image_params
+
 
 def load_display_config(display_type: str, displays_dir: Path = None) -> DisplayConfig:
     """
@@ -108,11 +197,10 @@ def load_display_config(display_type: str, displays_dir: Path = None) -> Display
         ValueError: If the configuration is invalid
     """
     if displays_dir is None:
-        displays_dir = Path(__file__).parent / "displays"
+        displays_dir = _DEFAULT_DISPLAYS_DIR
 
     # Check for persistent (custom) config first
-    persistent_dir = Path("/data/eink_art/displays")
-    persistent_file = persistent_dir / f"{display_type}.yaml"
+    persistent_file = _PERSISTENT_DIR / f"{display_type}.yaml"
 
     if persistent_file.exists():
         config_file = persistent_file
@@ -125,12 +213,47 @@ def load_display_config(display_type: str, displays_dir: Path = None) -> Display
             f"Available displays: {', '.join(f.stem for f in displays_dir.glob('*.yaml'))}"
         )
 
+    # Reuse the parsed config while the file is unchanged; the mtime in
+    # the cache key makes stale entries simple misses
+    return _load_config_cached(
+        config_file, config_file.stat().st_mtime_ns, display_type
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(
+    config_file: Path, mtime_ns: int, display_type: str
+) -> DisplayConfig:
+    """Parse a config file, memoized on (path, mtime, type).
+
+    A pickled copy of the parsed dict is kept beside the YAML
+    (<name>.yaml.pkl) and preferred when at least as new as the source —
+    unpickling is roughly twice as fast as even the C YAML parser, which
+    matters for cold starts. The sidecar is written best-effort and a
+    stale or unreadable one simply falls through to the parser.
+    """
+    pkl_file = config_file.with_suffix(".yaml.pkl")
     try:
-        with open(config_file, "r") as f:
-            config_data = yaml.safe_load(f)
+        if pkl_file.stat().st_mtime_ns >= mtime_ns:
+            with open(pkl_file, "rb") as f:
+                return DisplayConfig(pickle.load(f), display_type)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    try:
+        # Binary read: libyaml scans the raw UTF-8 directly, skipping the
+        # text layer's decode and line-ending translation
+        with open(config_file, "rb") as f:
+            config_data = yaml.load(f.read(), Loader=_Loader)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML in {config_file}: {e}")
 
+    try:
+        with open(pkl_file, "wb") as f:
+            pickle.dump(config_data, f, protocol=5)
+    except OSError:
+        pass  # read-only directory; caching is optional
+
     return DisplayConfig(config_data, display_type)
 
 
@@ -145,17 +268,19 @@ def list_available_displays(displays_dir: Path = None) -> List[str]:
         List of available display type names
     """
     if displays_dir is None:
-        displays_dir = Path(__file__).parent / "displays"
+        displays_dir = _DEFAULT_DISPLAYS_DIR
 
     display_names = set()
 
-    # Add default displays
-    if displays_dir.exists():
-        display_names.update(f.stem for f in displays_dir.glob("*.yaml"))
-
-    # Add persistent (custom) displays
-    persistent_dir = Path("/data/eink_art/displays")
-    if persistent_dir.exists():
-        display_names.update(f.stem for f in persistent_dir.glob("*.yaml"))
-
-    return sorted(list(display_names))
+    # One scandir per directory; DirEntry names need no extra stat, and
+    # catching FileNotFoundError replaces the exists() probes
+    for d in (displays_dir, _PERSISTENT_DIR):
+        try:
+            with os.scandir(d) as it:
+                display_names.update(
+                    e.name[:-5] for e in it if e.name.endswith(".yaml")
+                )
+        except FileNotFoundError:
+            pass
+
+    return sorted(display_names)
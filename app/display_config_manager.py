@@ -4,18 +4,63 @@ Manages persistent storage and editing of display configuration files.
 User-modified configurations are stored separately to persist across addon updates.
 """
 
+import os
+import re
+import shutil
 import yaml
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# Prefer the libyaml-backed loader; it parses an order of magnitude
+# faster than the pure-Python SafeLoader and raises the same errors
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+from display_config import invalidate_config_cache
+
 logger = logging.getLogger(__name__)
 
 # Configuration directories
 DEFAULT_DISPLAYS_DIR = Path(__file__).parent / "displays"
 PERSISTENT_DISPLAYS_DIR = Path("/data/eink_art/displays")  # Outside the addon container
 
+# Valid display names: alphanumeric plus hyphens and underscores
+_VALID_NAME = re.compile(r"\A[A-Za-z0-9_-]+\Z")
+
+
+def _validate_yaml(yaml_content: str):
+    """Check that a string is well-formed YAML without building objects.
+
+    Draining the parser's event stream runs the C scanner/parser only,
+    skipping the compose/construct phases a full load would pay for —
+    the raw string is what gets written, so the objects are never used.
+
+    Raises:
+        ValueError: If the YAML is invalid
+    """
+    try:
+        for _ in yaml.parse(yaml_content, Loader=_Loader):
+            pass
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}")
+
+
+def _atomic_write(path: Path, text: str):
+    """Write text to path atomically via a temp file and os.replace.
+
+    A crash mid-write can no longer leave a truncated config behind;
+    readers see either the old file or the new one. No fsync — the
+    rename is atomic and the kernel flushes config-sized writes quickly.
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
 
 class DisplayConfigManager:
     """Manages display configurations with persistent storage"""
@@ -27,6 +72,11 @@ class DisplayConfigManager:
         self.persistent_dir.mkdir(parents=True, exist_ok=True)
 
         self.default_dir = DEFAULT_DISPLAYS_DIR
+        # Cached YAML strings keyed by display name; invalidated on mutation
+        self._content_cache = {}
+        # list_displays() memo; key is the (default, persistent) dir mtimes
+        self._list_cache = None
+        self._list_key = None
         logger.info(f"DisplayConfigManager initialized")
         logger.info(f"  Default configs: {self.default_dir}")
         logger.info(f"  Persistent configs: {self.persistent_dir}")
@@ -44,17 +94,18 @@ class DisplayConfigManager:
         Raises:
             FileNotFoundError: If config doesn't exist
         """
+        # EAFP: one stat per candidate instead of exists() plus open()
         # Check persistent storage first
-        persistent_file = self.persistent_dir / f"{display_name}.yaml"
-        if persistent_file.exists():
-            return persistent_file
+        try:
+            return (self.persistent_dir / f"{display_name}.yaml").resolve(strict=True)
+        except FileNotFoundError:
+            pass
 
         # Fall back to default configs
-        default_file = self.default_dir / f"{display_name}.yaml"
-        if default_file.exists():
-            return default_file
-
-        raise FileNotFoundError(f"Display config not found: {display_name}")
+        try:
+            return (self.default_dir / f"{display_name}.yaml").resolve(strict=True)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Display config not found: {display_name}")
 
     def list_displays(self) -> List[Dict]:
         """
@@ -66,26 +117,53 @@ class DisplayConfigManager:
             - is_custom: True if modified by user, False if default
             - modified_at: Timestamp of last modification (for custom configs)
         """
+        # Directory mtimes change whenever a config is added, removed or
+        # rewritten, so two stats decide whether the cached list is current
+        try:
+            default_mtime = self.default_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            default_mtime = 0
+        key = (default_mtime, self.persistent_dir.stat().st_mtime_ns)
+        if key == self._list_key:
+            return self._list_cache
+
         displays = {}
 
+        # scandir yields names and cached stat info in a single pass,
+        # instead of glob's per-entry stat plus our own exists() probes
         # Add default displays
-        if self.default_dir.exists():
-            for config_file in self.default_dir.glob("*.yaml"):
-                name = config_file.stem
-                displays[name] = {"name": name, "is_custom": False, "modified_at": None}
+        try:
+            with os.scandir(self.default_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".yaml"):
+                        name = entry.name[:-5]
+                        displays[name] = {
+                            "name": name,
+                            "is_custom": False,
+                            "modified_at": None,
+                        }
+        except FileNotFoundError:
+            pass
 
         # Override with persistent/custom displays
-        if self.persistent_dir.exists():
-            for config_file in self.persistent_dir.glob("*.yaml"):
-                name = config_file.stem
-                stat = config_file.stat()
-                displays[name] = {
-                    "name": name,
-                    "is_custom": True,
-                    "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                }
-
-        return sorted(displays.values(), key=lambda x: x["name"])
+        try:
+            with os.scandir(self.persistent_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".yaml"):
+                        name = entry.name[:-5]
+                        displays[name] = {
+                            "name": name,
+                            "is_custom": True,
+                            "modified_at": datetime.fromtimestamp(
+                                entry.stat().st_mtime
+                            ).isoformat(),
+                        }
+        except FileNotFoundError:
+            pass
+
+        self._list_cache = sorted(displays.values(), key=lambda x: x["name"])
+        self._list_key = key
+        return self._list_cache
 
     def load_display_config(self, display_name: str) -> str:
         """
@@ -100,10 +178,18 @@ class DisplayConfigManager:
         Raises:
             FileNotFoundError: If config doesn't exist
         """
+        cached = self._content_cache.get(display_name)
+        if cached is not None:
+            return cached
+
         config_file = self.get_display_config_file(display_name)
         try:
-            with open(config_file, "r") as f:
-                return f.read()
+            # Read bytes and decode once, rather than the text layer's
+            # incremental decode through its own buffer
+            with open(config_file, "rb") as f:
+                content = f.read().decode("utf-8")
+            self._content_cache[display_name] = content
+            return content
         except Exception as e:
             logger.error(f"Error loading display config {display_name}: {e}")
             raise
@@ -124,17 +210,15 @@ class DisplayConfigManager:
             ValueError: If YAML is invalid
         """
         # Validate YAML
-        try:
-            yaml.safe_load(yaml_content)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML: {e}")
+        _validate_yaml(yaml_content)
 
         # Save to persistent storage
         config_file = self.persistent_dir / f"{display_name}.yaml"
         try:
-            with open(config_file, "w") as f:
-                f.write(yaml_content)
+            _atomic_write(config_file, yaml_content)
 
+            self._content_cache[display_name] = yaml_content
+            invalidate_config_cache(config_file)
             logger.info(f"Display config saved: {display_name}")
 
             return {
@@ -177,6 +261,9 @@ class DisplayConfigManager:
 
         try:
             persistent_file.unlink()
+            persistent_file.with_suffix(".yaml.pkl").unlink(missing_ok=True)
+            self._content_cache.pop(display_name, None)
+            invalidate_config_cache(persistent_file)
             logger.info(f"Display config reset to default: {display_name}")
 
             return {
@@ -206,7 +293,7 @@ class DisplayConfigManager:
             ValueError: If new name already exists or is invalid
         """
         # Validate new name
-        if not new_name or not new_name.replace("_", "").replace("-", "").isalnum():
+        if not _VALID_NAME.match(new_name):
             raise ValueError(
                 "Display name must contain only alphanumeric characters, hyphens, and underscores"
             )
@@ -220,12 +307,9 @@ class DisplayConfigManager:
             raise ValueError(f"Display configuration '{new_name}' already exists")
 
         try:
-            with open(source_file, "r") as f:
-                content = f.read()
-
-            with open(new_file, "w") as f:
-                f.write(content)
-
+            # Kernel-side copy (copy_file_range/sendfile) — the content
+            # never passes through Python; the cache fills lazily on read
+            shutil.copyfile(source_file, new_file)
             logger.info(f"Display config duplicated: {source_name} -> {new_name}")
 
             return {
@@ -264,6 +348,9 @@ class DisplayConfigManager:
 
         try:
             persistent_file.unlink()
+            persistent_file.with_suffix(".yaml.pkl").unlink(missing_ok=True)
+            self._content_cache.pop(display_name, None)
+            invalidate_config_cache(persistent_file)
             logger.info(f"Display config deleted: {display_name}")
 
             return {
@@ -316,29 +403,31 @@ class DisplayConfigManager:
 
         display_name = filename[:-5]  # Remove .yaml extension
 
-        if (
-            not display_name
-            or not display_name.replace("_", "").replace("-", "").isalnum()
-        ):
+        if not _VALID_NAME.match(display_name):
             raise ValueError(
                 "Display name must contain only alphanumeric characters, hyphens, and underscores"
             )
 
+        # Cheap byte-level prefilters before handing the payload to the
+        # YAML parser: bound the parse cost and fail fast on junk
+        if len(yaml_content) > 65536:
+            raise ValueError("Configuration too large (max 64 KB)")
+        if not yaml_content.strip():
+            raise ValueError("Configuration is empty")
+
         # Check if exists
         config_file = self.persistent_dir / f"{display_name}.yaml"
         if config_file.exists() and not overwrite:
             raise FileExistsError(f"Configuration '{display_name}' already exists")
 
         # Validate YAML
-        try:
-            yaml.safe_load(yaml_content)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML: {e}")
+        _validate_yaml(yaml_content)
 
         try:
-            with open(config_file, "w") as f:
-                f.write(yaml_content)
+            _atomic_write(config_file, yaml_content)
 
+            self._content_cache[display_name] = yaml_content
+            invalidate_config_cache(config_file)
             logger.info(f"Display config imported: {display_name}")
 
             return {
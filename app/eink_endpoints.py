@@ -3,23 +3,173 @@ E-Ink image processing endpoints
 Handles image processing and delivery for e-ink displays
 """
 
+import asyncio
+import hashlib
+import io
 import logging
+import os
 import random
-from pathlib import Path
 import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 from aiohttp import web
-import aiofiles
+from PIL import Image
 
 from display_config import load_display_config, list_available_displays
-from image_utils import process_image
+from image_utils import process_image_obj
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared executor for renders, bounded to the CPU count. The default
+# to_thread pool allows far more threads than cores, so a burst of
+# requests would run that many pipelines at once, each holding
+# megabytes of decode buffers. PIL releases the GIL in its C code,
+# so one thread per core already gives full parallelism; a process
+# pool would only add per-request pickling of image buffers.
+_RENDER_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 2, thread_name_prefix="eink-render"
+)
+
+# Rendered-PNG LRU cache. Slideshows request the same image/display
+# combination over and over; a hit skips the whole decode/resize/
+# quantize/encode pipeline. Keyed by the gallery version (bumped on
+# mutations) and the config object (replaced when its file changes),
+# so stale entries simply stop matching and age out. Values are paths
+# into the disk cache below, served zero-copy via FileResponse.
+_RENDER_CACHE = OrderedDict()
+_RENDER_CACHE_MAX = 128
+_render_cache_lock = asyncio.Lock()
+
+# Persistent second tier: files named by a hash of the source bytes and
+# every render parameter, sharded into 256 subdirectories. Content
+# addressing makes entries self-invalidating (a changed source or
+# palette simply hashes elsewhere) and keeps the cache warm across
+# restarts.
+_RENDER_CACHE_DIR = Path("/data/eink_art/render_cache")
+_RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _render_cache_path(data: bytes, config, crop: bool) -> Path:
+    """Content-addressed cache location for one render.
+
+    Args:
+        data: Raw source image bytes
+        config: DisplayConfig for the target display
+        crop: Whether to crop or letterbox when resizing
+
+    Returns:
+        Path inside the render cache (file may or may not exist yet)
+    """
+    h = hashlib.blake2b(data, digest_size=16)
+    width, height = config.get_resolution()
+    h.update(config.palette_array.tobytes())
+    h.update(f"{width}:{height}:{config.gamma}:{int(crop)}".encode())
+    digest = h.hexdigest()
+    return _RENDER_CACHE_DIR / digest[:2] / f"{digest}.png"
+
+
+def _render_png(data: bytes, config, crop: bool = True) -> bytes:
+    """Decode image bytes, process them for a display, and PNG-encode.
+
+    Everything stays in memory — no tempfile round-trip through disk.
+    CPU-bound (LANCZOS resize, Floyd-Steinberg quantize, PNG encode);
+    handlers run it via asyncio.to_thread so the event loop stays free,
+    and PIL's C code releases the GIL for the heavy parts.
+
+    Args:
+        data: Raw source image bytes
+        config: DisplayConfig for the target display
+        crop: Whether to crop or letterbox when resizing
+
+    Returns:
+        PNG-encoded processed image bytes
+    """
+    img = Image.open(io.BytesIO(data))
+    processed = process_image_obj(
+        img, dither=True, resize=True, crop=crop, **config.to_process_image_params()
+    )
+    buf = io.BytesIO()
+    # Palette-mode output with a handful of colors has almost no entropy
+    # left for zlib to find; level-1 deflate is several times faster than
+    # the default for a file only a few percent larger
+    processed.save(buf, format="PNG", compress_level=1, optimize=False)
+    return buf.getvalue()
+
+
+async def _render_png_cached(gallery, filename: str, config, crop: bool = True) -> Path:
+    """Fetch-and-render with an LRU cache of finished PNGs on disk.
+
+    A hit returns the cached file path; handlers hand it to FileResponse
+    so aiohttp streams it with sendfile instead of copying the bytes
+    through user space. Files are content-addressed and persist across
+    restarts; the in-memory LRU only short-circuits the hash and stat.
+
+    Args:
+        gallery: GalleryManager to read the source image from
+        filename: Full image filename
+        config: DisplayConfig for the target display
+        crop: Whether to crop or letterbox when resizing
+
+    Returns:
+        Path of the rendered PNG in the cache directory
+
+    Raises:
+        FileNotFoundError: If the image doesn't exist
+    """
+    key = (gallery.version, filename, config, crop)
+    async with _render_cache_lock:
+        path = _RENDER_CACHE.get(key)
+        if path is not None:
+            _RENDER_CACHE.move_to_end(key)
+            return path
+
+    data = await gallery.get_image(filename)
+
+    # Hashing the source is microseconds against the pipeline's hundreds
+    # of milliseconds, so a warm disk entry is nearly free
+    path = _render_cache_path(data, config, crop)
+    if not await asyncio.to_thread(path.exists):
+        png = await asyncio.get_running_loop().run_in_executor(
+            _RENDER_POOL, _render_png, data, config, crop
+        )
 
-async def api_get_eink_image(gallery, request: web.Request) -> web.Response:
+        # Atomic publish: write a sibling temp file and rename over the
+        # final name, so concurrent readers never see a partial PNG. The
+        # temp name must be per-writer — two first renders of the same
+        # digest can race here, and a shared name would leave the loser
+        # replacing a file the winner already consumed.
+        def _write():
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(png)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+                raise
+
+        await asyncio.to_thread(_write)
+
+    async with _render_cache_lock:
+        _RENDER_CACHE[key] = path
+        _RENDER_CACHE.move_to_end(key)
+        # The memory tier is just an index of hot keys; evicted entries
+        # keep their files, which is the point of the persistent tier
+        while len(_RENDER_CACHE) > _RENDER_CACHE_MAX:
+            _RENDER_CACHE.popitem(last=False)
+    return path
+
+
+async def api_get_eink_image(request: web.Request) -> web.Response:
     """GET /api/images/eink/{filename} - Get processed image for e-ink display (filename can be basename without extension)"""
+    gallery = request.app["gallery"]
     try:
         basename = request.match_info.get('filename')
         display_type = request.rel_url.query.get('display')
@@ -51,38 +201,12 @@ async def api_get_eink_image(gallery, request: web.Request) -> web.Response:
                 status=404
             )
 
-        # Get original image data
-        data = await gallery.get_image(filename)
-
-        # Process image using display configuration
-        params = config.to_process_image_params()
-
-        # Create temporary files for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            input_file = temp_path / filename
-
-            # Write original image
-            async with aiofiles.open(input_file, 'wb') as f:
-                await f.write(data)
-
-            # Process image (synchronous operation) - returns PIL Image
-            processed_image = process_image(
-                input_path=str(input_file),
-                dither=True,
-                resize=True,
-                crop=crop,
-                **params
-            )
-
-            # Convert PIL Image to PNG bytes
-            import io
-            png_buffer = io.BytesIO()
-            processed_image.save(png_buffer, format='PNG')
-            processed_data = png_buffer.getvalue()
+        # Render (or reuse a cached render of) the processed PNG
+        png_path = await _render_png_cached(gallery, filename, config, crop)
 
-        # Always return PNG for eink endpoint
-        return web.Response(body=processed_data, content_type='image/png')
+        # Always return PNG for eink endpoint; FileResponse streams the
+        # cached file via sendfile without copying through Python
+        return web.FileResponse(png_path)
 
     except FileNotFoundError:
         return web.json_response(
@@ -103,8 +227,9 @@ async def api_get_eink_image(gallery, request: web.Request) -> web.Response:
         )
 
 
-async def api_get_random_eink_image(gallery, request: web.Request) -> web.Response:
+async def api_get_random_eink_image(request: web.Request) -> web.Response:
     """GET /api/images/eink/random - Get a random processed image for e-ink display"""
+    gallery = request.app["gallery"]
     try:
         display_type = request.rel_url.query.get('display')
         tags_param = request.rel_url.query.get('tags')
@@ -126,25 +251,9 @@ async def api_get_random_eink_image(gallery, request: web.Request) -> web.Respon
 
         # Filter by tags if provided
         if tags_param:
-            # Parse comma-separated tags
-            requested_tags = [tag.strip().lower() for tag in tags_param.split(',') if tag.strip()]
-
-            # Filter images that have at least one of the requested tags
-            filtered_images = []
-            for img in all_images:
-                # Handle both string tags and dict tags (in case they're stored as dicts)
-                raw_tags = img.get('tags', [])
-                img_tags = []
-                for tag in raw_tags:
-                    if isinstance(tag, str):
-                        img_tags.append(tag.lower())
-                    elif isinstance(tag, dict) and 'name' in tag:
-                        img_tags.append(tag['name'].lower())
-                    elif isinstance(tag, dict) and 'tag' in tag:
-                        img_tags.append(tag['tag'].lower())
-
-                if any(tag in img_tags for tag in requested_tags):
-                    filtered_images.append(img)
+            # Set lookup against the gallery's tag index instead of
+            # scanning every image's tag list
+            filtered_images = gallery.filter_images_by_tags(_parse_tags(tags_param))
 
             if not filtered_images:
                 return web.json_response(
@@ -177,41 +286,14 @@ async def api_get_random_eink_image(gallery, request: web.Request) -> web.Respon
                 status=404
             )
 
-        # Get original image data
-        data = await gallery.get_image(filename)
-
-        # Process image using display configuration
-        params = config.to_process_image_params()
-
-        # Create temporary files for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            input_file = temp_path / filename
-
-            # Write original image
-            async with aiofiles.open(input_file, 'wb') as f:
-                await f.write(data)
-
-            # Process image (synchronous operation) - returns PIL Image
-            processed_image = process_image(
-                input_path=str(input_file),
-                dither=True,
-                resize=True,
-                crop=True,
-                **params
-            )
-
-            # Convert PIL Image to PNG bytes
-            import io
-            png_buffer = io.BytesIO()
-            processed_image.save(png_buffer, format='PNG')
-            processed_data = png_buffer.getvalue()
+        # Render (or reuse a cached render of) the processed PNG
+        png_path = await _render_png_cached(gallery, filename, config)
 
         # Always return PNG for eink endpoint
         # Add custom header to indicate which image was selected
-        response = web.Response(body=processed_data, content_type='image/png')
-        response.headers['X-Selected-Image'] = filename
-        return response
+        return web.FileResponse(
+            png_path, headers={'X-Selected-Image': filename}
+        )
 
     except FileNotFoundError as e:
         logger.error(f"Image not found: {e}")
@@ -233,43 +315,19 @@ async def api_get_random_eink_image(gallery, request: web.Request) -> web.Respon
         )
 
 
-def _filter_images_by_tags(images: list, tags_param: str) -> list:
-    """Helper function to filter images by tags.
+def _parse_tags(tags_param: str) -> list:
+    """Parse a comma-separated tag parameter into lowercase tag names.
 
     Args:
-        images: List of image dictionaries
         tags_param: Comma-separated tag string
 
     Returns:
-        List of filtered images that have at least one of the requested tags
+        List of normalized tag names
     """
-    if not tags_param:
-        return images
+    return [tag.strip().lower() for tag in tags_param.split(',') if tag.strip()]
 
-    # Parse comma-separated tags
-    requested_tags = [tag.strip().lower() for tag in tags_param.split(',') if tag.strip()]
 
-    # Filter images that have at least one of the requested tags
-    filtered_images = []
-    for img in images:
-        # Handle both string tags and dict tags
-        raw_tags = img.get('tags', [])
-        img_tags = []
-        for tag in raw_tags:
-            if isinstance(tag, str):
-                img_tags.append(tag.lower())
-            elif isinstance(tag, dict) and 'name' in tag:
-                img_tags.append(tag['name'].lower())
-            elif isinstance(tag, dict) and 'tag' in tag:
-                img_tags.append(tag['tag'].lower())
-
-        if any(tag in img_tags for tag in requested_tags):
-            filtered_images.append(img)
-
-    return filtered_images
-
-
-async def api_get_next_eink_image(gallery, request: web.Request) -> web.Response:
+async def api_get_next_eink_image(request: web.Request) -> web.Response:
     """GET /api/images/eink/next - Get next processed image for e-ink display by index
 
     Query parameters:
@@ -280,6 +338,7 @@ async def api_get_next_eink_image(gallery, request: web.Request) -> web.Response
     Returns:
         Processed image as PNG with X-Selected-Image and X-Image-Index headers
     """
+    gallery = request.app["gallery"]
     try:
         display_type = request.rel_url.query.get('display')
         current_index_str = request.rel_url.query.get('current_index')
@@ -317,7 +376,9 @@ async def api_get_next_eink_image(gallery, request: web.Request) -> web.Response
 
         # Filter by tags if provided
         if tags_param:
-            images_to_choose_from = _filter_images_by_tags(all_images, tags_param)
+            images_to_choose_from = gallery.filter_images_by_tags(
+                _parse_tags(tags_param)
+            )
 
             if not images_to_choose_from:
                 return web.json_response(
@@ -349,42 +410,18 @@ async def api_get_next_eink_image(gallery, request: web.Request) -> web.Response
                 status=404
             )
 
-        # Get original image data
-        data = await gallery.get_image(filename)
-
-        # Process image using display configuration
-        params = config.to_process_image_params()
-
-        # Create temporary files for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            input_file = temp_path / filename
-
-            # Write original image
-            async with aiofiles.open(input_file, 'wb') as f:
-                await f.write(data)
-
-            # Process image (synchronous operation) - returns PIL Image
-            processed_image = process_image(
-                input_path=str(input_file),
-                dither=True,
-                resize=True,
-                crop=True,
-                **params
-            )
-
-            # Convert PIL Image to PNG bytes
-            import io
-            png_buffer = io.BytesIO()
-            processed_image.save(png_buffer, format='PNG')
-            processed_data = png_buffer.getvalue()
+        # Render (or reuse a cached render of) the processed PNG
+        png_path = await _render_png_cached(gallery, filename, config)
 
         # Always return PNG for eink endpoint
         # Add custom headers to indicate which image was selected and its index
-        response = web.Response(body=processed_data, content_type='image/png')
-        response.headers['X-Selected-Image'] = filename
-        response.headers['X-Image-Index'] = str(next_index)
-        return response
+        return web.FileResponse(
+            png_path,
+            headers={
+                'X-Selected-Image': filename,
+                'X-Image-Index': str(next_index),
+            },
+        )
 
     except FileNotFoundError as e:
         logger.error(f"Image not found: {e}")
@@ -0,0 +1,120 @@
+"""
+Floyd-Steinberg error-diffusion kernel for fixed e-ink palettes.
+
+Compiled with numba when it is installed (optional dependency). Callers
+must check HAVE_NUMBA before using the kernel on real images and fall
+back to PIL's quantize otherwise — the uncompiled Python loop is far
+too slow for production frames.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def _dither_pixel(img, out, lut, palette, gamma_lut, y, x, cur, nxt):
+    """Dither one pixel: gamma-map, quantize via the LUT, diffuse the error.
+
+    Gamma is fused into the same read — the pixel is gathered through
+    gamma_lut as it is loaded, so no separate gamma pass touches the
+    frame. cur/nxt are the error rows for y and y+1, padded one column
+    each side so the 7/16 and 1/16 taps never need bounds checks.
+    """
+    # Clamp the error-adjusted pixel back into 8-bit range
+    r = gamma_lut[img[y, x, 0]] + cur[x + 1, 0]
+    g = gamma_lut[img[y, x, 1]] + cur[x + 1, 1]
+    b = gamma_lut[img[y, x, 2]] + cur[x + 1, 2]
+    if r < 0.0:
+        r = 0.0
+    elif r > 255.0:
+        r = 255.0
+    if g < 0.0:
+        g = 0.0
+    elif g > 255.0:
+        g = 255.0
+    if b < 0.0:
+        b = 0.0
+    elif b > 255.0:
+        b = 255.0
+
+    # O(1) nearest-palette lookup instead of a distance search
+    idx = lut[int(r) >> 3, int(g) >> 3, int(b) >> 3]
+    out[y, x] = idx
+
+    er = r - palette[idx, 0]
+    eg = g - palette[idx, 1]
+    eb = b - palette[idx, 2]
+
+    # Classic 7/16, 3/16, 5/16, 1/16 distribution
+    cur[x + 2, 0] += er * 0.4375
+    cur[x + 2, 1] += eg * 0.4375
+    cur[x + 2, 2] += eb * 0.4375
+    nxt[x, 0] += er * 0.1875
+    nxt[x, 1] += eg * 0.1875
+    nxt[x, 2] += eb * 0.1875
+    nxt[x + 1, 0] += er * 0.3125
+    nxt[x + 1, 1] += eg * 0.3125
+    nxt[x + 1, 2] += eb * 0.3125
+    nxt[x + 2, 0] += er * 0.0625
+    nxt[x + 2, 1] += eg * 0.0625
+    nxt[x + 2, 2] += eb * 0.0625
+
+
+def _fs_dither_impl(img, lut, palette, gamma_lut):
+    """Two-row tandem Floyd-Steinberg dither to palette indices.
+
+    Rows are processed in pairs with row y+1 trailing row y by two
+    columns. Pixel (y+1, x-2) only depends on errors row y has already
+    finalized, and its error row is consumed while still hot in cache
+    instead of a full image width later — FS is memory-bound, so the
+    halved row-buffer traffic is where the time goes.
+
+    Args:
+        img: uint8 (h, w, 3) RGB pixels
+        lut: uint8 (32, 32, 32) nearest-palette-index cube, indexed by
+            the top 5 bits of each channel (DisplayConfig.rgb_to_index_lut)
+        palette: uint8 (k, 3) palette colors (DisplayConfig.palette_array)
+        gamma_lut: uint8 (256,) per-channel gamma curve, fused into the
+            sweep (pass an identity ramp for gamma 1.0)
+
+    Returns:
+        uint8 (h, w) array of palette indices
+    """
+    h = img.shape[0]
+    w = img.shape[1]
+    out = np.empty((h, w), dtype=np.uint8)
+
+    e0 = np.zeros((w + 2, 3), dtype=np.float32)  # errors into row y
+    e1 = np.zeros((w + 2, 3), dtype=np.float32)  # errors into row y + 1
+    e2 = np.zeros((w + 2, 3), dtype=np.float32)  # errors into row y + 2
+
+    y = 0
+    while y + 1 < h:
+        for x in range(w + 2):
+            if x < w:
+                _dither_pixel(img, out, lut, palette, gamma_lut, y, x, e0, e1)
+            if x >= 2:
+                _dither_pixel(img, out, lut, palette, gamma_lut, y + 1, x - 2, e1, e2)
+        # e2 feeds the next pair's top row; the spent rows become scratch
+        e0, e2 = e2, e0
+        e1[:] = 0.0
+        e2[:] = 0.0
+        y += 2
+
+    if y < h:  # odd trailing row
+        for x in range(w):
+            _dither_pixel(img, out, lut, palette, gamma_lut, y, x, e0, e1)
+
+    return out
+
+
+if HAVE_NUMBA:
+    _dither_pixel = njit(cache=True, fastmath=True, inline="always")(_dither_pixel)
+    fs_dither = njit(cache=True, fastmath=True)(_fs_dither_impl)
+else:
+    fs_dither = _fs_dither_impl
@@ -1,11 +1,79 @@
 from PIL import Image, ImageOps
+import functools
 import numpy as np
 import logging
 
+import fs_dither
+
+# OpenCV's LANCZOS4 resize is SIMD-vectorized and several times faster
+# than Pillow's scalar LANCZOS on multi-megapixel sources; use it when
+# available, fall back to the PIL paths otherwise
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _gamma_curve(gamma: float) -> np.ndarray:
+    """Build a uint8[256] curve for output = input ^ (1/gamma).
+
+    8-bit channels only have 256 distinct values, so the transcendental
+    pow runs 256 times here instead of once per pixel. Cached per gamma
+    since each display config uses a fixed value; gamma 1.0 yields the
+    identity ramp, which lets the dither kernel fuse the curve
+    unconditionally.
+    """
+    return ((np.arange(256) / 255.0) ** (1.0 / gamma) * 255.0 + 0.5).astype(np.uint8)
+
+
+@functools.lru_cache(maxsize=8)
+def _gamma_lut(gamma: float) -> list:
+    """RGB Image.point table built from the cached gamma curve."""
+    return _gamma_curve(gamma).tolist() * 3
+
+
+def _resize_cv2(source, width, height, crop):
+    """Resize with OpenCV's vectorized LANCZOS4, matching the PIL paths.
+
+    Args:
+        source: PIL Image in RGB mode
+        width: Target width
+        height: Target height
+        crop: True for fill-and-crop, False for fit/letterbox
+
+    Returns:
+        PIL Image of exactly (width, height)
+    """
+    arr = np.asarray(source)
+    src_h, src_w = arr.shape[:2]
+
+    if crop:
+        # Scale to cover the target, then crop the center
+        scale = max(width / src_w, height / src_h)
+        new_w = max(round(src_w * scale), width)
+        new_h = max(round(src_h * scale), height)
+        resized = cv2.resize(arr, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+        left = (new_w - width) // 2
+        top = (new_h - height) // 2
+        return Image.fromarray(resized[top : top + height, left : left + width])
+
+    # Scale to fit inside the target, centered on a black canvas
+    # (same geometry as ImageOps.pad)
+    scale = min(width / src_w, height / src_h)
+    new_w = max(round(src_w * scale), 1)
+    new_h = max(round(src_h * scale), 1)
+    resized = cv2.resize(arr, (new_w, new_h), interpolation=cv2.INTER_LANCZOS4)
+    canvas = np.zeros((height, width, 3), dtype=np.uint8)
+    left = (width - new_w) // 2
+    top = (height - new_h) // 2
+    canvas[top : top + new_h, left : left + new_w] = resized
+    return Image.fromarray(canvas)
+
+
 # Resize resolution as parameter
 def apply_gamma_correction(image, gamma=1.0):
     """
@@ -21,21 +89,12 @@ def apply_gamma_correction(image, gamma=1.0):
     if gamma == 1.0:
         return image
 
-    # Convert PIL image to numpy array
-    img_array = np.array(image, dtype=np.float32) / 255.0
-
-    # Apply gamma correction: output = input ^ (1/gamma)
-    corrected = np.power(img_array, 1.0 / gamma)
-
-    # Convert back to 0-255 range
-    corrected = (corrected * 255.0).astype(np.uint8)
-
-    # Convert back to PIL Image
-    return Image.fromarray(corrected, mode="RGB")
+    # Single C-level LUT pass in PIL, no numpy round-trip or temporaries
+    return image.point(_gamma_lut(gamma))
 
 
-def process_image(
-    input_path,
+def process_image_obj(
+    source,
     dither=True,
     resize=False,
     crop=False,
@@ -43,12 +102,17 @@ def process_image(
     height=480,
     palette_image=None,
     gamma=1.0,
+    palette_array=None,
+    rgb_to_index_lut=None,
 ):
     """
-    Process an image for e-ink display.
+    Process an already-opened image for e-ink display. Pure, no file I/O —
+    callers decode from disk or memory themselves (e.g. Image.open on a
+    BytesIO of uploaded data) so request handlers can skip the tempfile
+    round-trip.
 
     Args:
-        input_path: Path to the input image
+        source: PIL Image to process
         dither: Whether to use dithering (default: True)
         resize: Whether to resize the image (default: False)
         crop: Whether to crop or letterbox when resizing (default: False)
@@ -56,28 +120,55 @@ def process_image(
         height: Target height (default: 480)
         palette_image: Optional PIL Image with palette. If None, uses 3-bit palette.
         gamma: Gamma correction value (default: 1.0 = no correction, < 1.0 brightens, > 1.0 darkens)
+        palette_array: Optional uint8 (k, 3) palette colors; together with
+            rgb_to_index_lut enables the compiled dither kernel when numba
+            is installed
+        rgb_to_index_lut: Optional uint8 (32, 32, 32) nearest-index cube
+            (see DisplayConfig.rgb_to_index_lut)
 
     Returns:
         PIL Image: The processed image with quantized palette applied
     """
     try:
-        source = Image.open(input_path).convert("RGB")
+        # libjpeg can downscale by 1/2, 1/4 or 1/8 during the decode
+        # itself; for a multi-MP photo going to display resolution this
+        # skips decoding most of the pixels we would immediately throw away.
+        # The draft applies to the stored (pre-rotation) geometry, so for
+        # EXIF orientations 5-8 — which transpose width and height — the
+        # target must be swapped or the decode lands below display
+        # resolution and the resize pass has to upscale.
+        if resize and source.format == "JPEG":
+            orientation = source.getexif().get(0x0112, 1)
+            if orientation in (5, 6, 7, 8):
+                source.draft("RGB", (height, width))
+            else:
+                source.draft("RGB", (width, height))
+
         logger.info(f"source before conversion = {source.size}")
 
-        # Apply EXIF orientation if present to prevent unintended flips
+        # Apply EXIF orientation if present to prevent unintended flips.
+        # Done before the RGB conversion so the transpose isn't a second
+        # full pass over an already-converted copy.
         try:
             source = ImageOps.exif_transpose(source)
             logger.info("Applied EXIF orientation")
         except Exception as e:
             logger.warning(f"Could not apply EXIF orientation: {e}")
 
+        source = source.convert("RGB")
         logger.info(f"source = {source.size}")
 
         # --- Resizing Logic ---
-        if resize:
+        if resize and source.size == (width, height):
+            # Already display-sized (common when users pre-size their
+            # images); skip the LANCZOS pass entirely
+            pass
+        elif resize:
             target_size = (width, height)
 
-            if crop:
+            if cv2 is not None:
+                source = _resize_cv2(source, width, height, crop)
+            elif crop:
                 # "Fill and Crop":
                 # Scales the image to completely cover 800x480, then crops the center.
                 # No black bars, no distortion.
@@ -87,36 +178,69 @@ def process_image(
             else:
                 # "Fit / Letterbox":
                 # Scales to fit INSIDE 800x480. Adds black bars if aspect ratio differs.
-                source.thumbnail(target_size, Image.Resampling.LANCZOS)
-
-                # Create black background
-                new_bg = Image.new("RGB", target_size, (0, 0, 0))
-
-                # Center the image
-                left = (target_size[0] - source.width) // 2
-                top = (target_size[1] - source.height) // 2
-                new_bg.paste(source, (left, top))
-                source = new_bg
+                # Single C call; no separate background allocation + paste.
+                source = ImageOps.pad(
+                    source,
+                    target_size,
+                    method=Image.Resampling.LANCZOS,
+                    color=(0, 0, 0),
+                )
         # ----------------------
 
-        # Apply gamma correction if specified
-        if gamma != 1.0:
-            source = apply_gamma_correction(source, gamma)
-
         # Quantize to palette
         if palette_image is None:
             raise ValueError("No palette image provided.")
 
-        dither_mode = Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
-
-        output_image = source.quantize(palette=palette_image, dither=dither_mode)
+        if (
+            dither
+            and fs_dither.HAVE_NUMBA
+            and palette_array is not None
+            and rgb_to_index_lut is not None
+        ):
+            # Compiled Floyd-Steinberg with O(1) palette lookups; gamma
+            # is fused into the kernel's single sweep (identity curve for
+            # gamma 1.0), so no separate pass touches the frame
+            indices = fs_dither.fs_dither(
+                np.asarray(source, dtype=np.uint8),
+                rgb_to_index_lut,
+                palette_array,
+                _gamma_curve(gamma),
+            )
+            output_image = Image.fromarray(indices, mode="P")
+            output_image.putpalette(palette_image.getpalette())
+        else:
+            # Apply gamma correction if specified
+            if gamma != 1.0:
+                source = apply_gamma_correction(source, gamma)
+
+            dither_mode = Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+            output_image = source.quantize(palette=palette_image, dither=dither_mode)
         logger.info(f"✅ Processed {output_image.size[0]}x{output_image.size[1]} image successfully")
         
         return output_image
 
-    except FileNotFoundError as e:
-        logger.error(f"File not found: {input_path}")
-        raise FileNotFoundError(f"The file '{input_path}' was not found.") from e
     except Exception as e:
         logger.error(f"Error processing image: {e}")
         raise
+
+
+def process_image(input_path, **kwargs):
+    """
+    Process an image file for e-ink display.
+
+    Thin wrapper around process_image_obj() for path-based callers.
+
+    Args:
+        input_path: Path to the input image
+        **kwargs: Passed through to process_image_obj()
+
+    Returns:
+        PIL Image: The processed image with quantized palette applied
+    """
+    try:
+        source = Image.open(input_path)
+    except FileNotFoundError as e:
+        logger.error(f"File not found: {input_path}")
+        raise FileNotFoundError(f"The file '{input_path}' was not found.") from e
+
+    return process_image_obj(source, **kwargs)
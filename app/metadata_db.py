@@ -1,16 +1,144 @@
 #!/usr/bin/env python3
 """
 Metadata database module for managing image tags and metadata using SQLite
+
+Deliberately stays on the stdlib sqlite3 driver. apsw would expose true
+prepared-statement reuse, but it is a compiled wheel to build on every
+target (this runs on ARM devices as a Home Assistant add-on), its API is
+incompatible enough to fork every method (no isolation_level, different
+cursor and exception model), and the per-call overhead it saves is
+already mostly gone here: statements are module-level constants hitting
+the driver's statement cache, bulk paths use executemany, and the hot
+reads hit in-process caches before reaching SQLite at all.
 """
 
 import sqlite3
 import logging
+import queue
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
 from typing import List, Dict, Optional, Any
 
 logger = logging.getLogger(__name__)
 
+# Per-call statements as module constants: each execute then passes the
+# same string object, giving the sqlite3 statement cache its fastest
+# lookup. Schema DDL stays inline in _init_db since it runs once, and
+# the bulk queries that splice an IN (...) list are built where they're
+# used because their shape depends on the batch size.
+# Upsert rather than INSERT OR REPLACE: REPLACE deletes the old row and
+# inserts a fresh one with a new rowid, and with image_tags keyed to
+# images(id) under foreign_keys=ON the cascade would wipe the image's
+# tags on every re-upload. The upsert keeps the row id stable.
+_SQL_ADD_IMAGE = '''
+    INSERT INTO images (filename, title, description, uploaded_at, updated_at)
+    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(filename) DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        uploaded_at = excluded.uploaded_at,
+        updated_at = CURRENT_TIMESTAMP
+'''
+
+# OR IGNORE, not OR REPLACE: this path registers files the caller
+# believes are missing from the table. If that belief is wrong (e.g. a
+# transient read error made get_metadata_bulk return {}), REPLACE would
+# blank every existing row; IGNORE makes the call a no-op for rows that
+# already exist.
+_SQL_ADD_IMAGE_BLANK = '''
+    INSERT OR IGNORE INTO images (filename, title, description, uploaded_at, updated_at)
+    VALUES (?, '', '', ?, CURRENT_TIMESTAMP)
+'''
+
+_SQL_REMOVE_IMAGE = 'DELETE FROM images WHERE filename = ?'
+
+_SQL_GET_IMAGE = '''
+    SELECT filename, title, description, uploaded_at, created_at, updated_at
+    FROM images
+    WHERE filename = ?
+'''
+
+_SQL_GET_IMAGE_TAGS = '''
+    SELECT t.tag_id, t.name
+    FROM tags t
+    JOIN image_tags it ON t.tag_id = it.tag_id
+    WHERE it.image_id = (SELECT id FROM images WHERE filename = ?)
+    ORDER BY t.name
+'''
+
+_SQL_UPSERT_TAG = '''
+    INSERT INTO tags (name) VALUES (?)
+    ON CONFLICT(name) DO UPDATE SET name = excluded.name
+    RETURNING tag_id
+'''
+
+_SQL_RESOLVE_TAG_ID = 'SELECT tag_id FROM tags WHERE name = ?'
+
+_SQL_ADD_ASSOCIATION = '''
+    INSERT OR IGNORE INTO image_tags (image_id, tag_id)
+    VALUES ((SELECT id FROM images WHERE filename = ?), ?)
+'''
+
+_SQL_REMOVE_ASSOCIATION = '''
+    DELETE FROM image_tags
+    WHERE image_id = (SELECT id FROM images WHERE filename = ?) AND tag_id = ?
+'''
+
+_SQL_REMOVE_TAG_EVERYWHERE = 'DELETE FROM image_tags WHERE tag_id = ?'
+
+_SQL_GET_SETTING = 'SELECT value FROM settings WHERE key = ?'
+
+_SQL_SET_SETTING = 'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)'
+
+_SQL_GET_ALL_TAGS = '''
+    SELECT t.tag_id, t.name, COUNT(it.image_id) as usage_count
+    FROM tags t
+    LEFT JOIN image_tags it ON t.tag_id = it.tag_id
+    GROUP BY t.tag_id, t.name
+    ORDER BY t.name
+'''
+
+# Direct probe on idx_image_tags_tag_id once the id is known; the join
+# only recovers the filenames. No DISTINCT: the (image_id, tag_id)
+# primary key means an image can match a tag at most once, so the
+# dedup pass would only sort rows that are already unique.
+_SQL_IMAGES_BY_TAG = '''
+    SELECT i.filename
+    FROM image_tags it
+    JOIN images i ON i.id = it.image_id
+    WHERE it.tag_id = ?
+    ORDER BY i.filename
+'''
+
+_SQL_SEARCH = '''
+    SELECT i.filename
+    FROM images i
+    WHERE i.id IN (SELECT rowid FROM images_fts WHERE images_fts MATCH ?)
+    ORDER BY i.filename
+'''
+
+# One flat LEFT JOIN instead of a tag query per image (N+1); rows arrive
+# grouped by filename so a single pass reassembles the per-image tag lists
+_SQL_ALL_IMAGES = '''
+    SELECT i.filename, i.title, i.description, i.uploaded_at,
+           i.created_at, i.updated_at, t.tag_id, t.name
+    FROM images i
+    LEFT JOIN image_tags it ON it.image_id = i.id
+    LEFT JOIN tags t ON t.tag_id = it.tag_id
+    ORDER BY i.filename, t.name
+'''
+
+# The four fixed shapes of the metadata UPDATE, keyed by
+# (title given, description given). Static strings hit sqlite3's
+# statement cache; a query built per call never does.
+_UPDATE_QUERIES = {
+    (True, True): "UPDATE images SET updated_at = CURRENT_TIMESTAMP, title = ?, description = ? WHERE filename = ?",
+    (True, False): "UPDATE images SET updated_at = CURRENT_TIMESTAMP, title = ? WHERE filename = ?",
+    (False, True): "UPDATE images SET updated_at = CURRENT_TIMESTAMP, description = ? WHERE filename = ?",
+    (False, False): "UPDATE images SET updated_at = CURRENT_TIMESTAMP WHERE filename = ?",
+}
+
 
 class MetadataDatabase:
     """SQLite database for managing image metadata and tags"""
@@ -23,13 +151,183 @@ class MetadataDatabase:
         """
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One long-lived connection instead of connect/close per call:
+        # reconnecting discards SQLite's page cache and re-opens the file
+        # for every query. check_same_thread=False because handlers touch
+        # the db from asyncio.to_thread workers; the lock serializes
+        # writers. WAL mode keeps readers from blocking behind a write.
+        # isolation_level=None is true autocommit: the driver stops
+        # wrapping DML in implicit transactions, so reads skip that
+        # bookkeeping entirely and writes manage their own transaction
+        # in _write() below
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, cached_statements=256,
+            isolation_level=None
+        )
+        # C-implemented rows indexable by column name; dict(row) replaces
+        # the per-row hand-built dicts below, and positional access and
+        # tuple unpacking keep working where that reads better
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-64000;"
+            "PRAGMA mmap_size=268435456;"
+            # Default is 1000 pages, which lands a checkpoint stall in
+            # the middle of an import burst; 10000 keeps checkpoints out
+            # of the hot path and checkpoint() drains the WAL from idle
+            # moments instead
+            "PRAGMA wal_autocheckpoint=10000;"
+            "PRAGMA foreign_keys=ON;"
+            # So INSERT OR REPLACE fires the delete triggers that keep
+            # the search index in sync
+            "PRAGMA recursive_triggers=ON;"
+        )
+
+        # Track freed pages so vacuum() can hand them back instead of
+        # letting deletes fragment the file. Switching the mode only
+        # takes effect through a VACUUM, so databases still on NONE get
+        # a one-time rewrite (these files are small).
+        if self._conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 0:
+            self._conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            self._conn.execute('VACUUM')
+        # tag_name -> tag_id cache. The vocabulary is small and tag rows
+        # are never deleted by this module, so entries cannot go stale;
+        # it saves a SELECT on every tag operation.
+        self._tag_id_cache: Dict[str, int] = {}
+
+        # Writes since the last PRAGMA optimize (see _count_write)
+        self._write_count = 0
+
         self._init_db()
 
+        # WAL lets any number of readers run while the shared connection
+        # writes, so reads don't have to queue behind the writer lock.
+        # The pool connections are opened read-only (and query_only as a
+        # belt-and-braces guard) — all writes go through self._conn.
+        self._readers = queue.Queue()
+        for _ in range(self._READER_COUNT):
+            reader = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False,
+                isolation_level=None
+            )
+            reader.row_factory = sqlite3.Row
+            reader.executescript(
+                "PRAGMA query_only=ON;"
+                "PRAGMA cache_size=-16000;"
+                "PRAGMA mmap_size=268435456;"
+            )
+            self._readers.put(reader)
+
+    _READER_COUNT = 4
+
+    def _resolve_tag_id(self, tag_name: str) -> Optional[int]:
+        """Resolve a tag name to its id through the in-process cache.
+
+        Args:
+            tag_name: Tag name to resolve
+
+        Returns:
+            The tag_id, or None if the tag doesn't exist
+        """
+        tag_id = self._tag_id_cache.get(tag_name)
+        if tag_id is None:
+            with self._reader() as conn:
+                row = conn.execute(_SQL_RESOLVE_TAG_ID, (tag_name,)).fetchone()
+            if row is None:
+                return None
+            tag_id = self._tag_id_cache[tag_name] = row[0]
+        return tag_id
+
+    @contextmanager
+    def _reader(self):
+        """Check a read-only connection out of the pool."""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def _write(self):
+        """Serialize a write and wrap it in an explicit transaction.
+
+        BEGIN IMMEDIATE claims the WAL write lock up front instead of
+        upgrading a read transaction mid-statement; COMMIT/ROLLBACK are
+        explicit because the connection runs in autocommit.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            else:
+                self._conn.execute('COMMIT')
+
+    def _count_write(self):
+        """Refresh planner statistics every 1000 write transactions.
+
+        PRAGMA optimize re-runs ANALYZE only for tables whose content
+        changed enough to matter, so the periodic call stays cheap.
+        """
+        self._write_count += 1
+        if self._write_count % 1000 == 0:
+            self._conn.execute('PRAGMA optimize')
+
+    def analyze(self):
+        """Rebuild planner statistics; call after a large import."""
+        with self._lock:
+            self._conn.execute('ANALYZE')
+
+    def vacuum(self, pages: int = 1000):
+        """Return freed pages to the filesystem; call after a bulk delete.
+
+        Args:
+            pages: Maximum number of freelist pages to reclaim
+        """
+        with self._lock:
+            self._conn.execute(f'PRAGMA incremental_vacuum({int(pages)})')
+
+    def checkpoint(self, mode: str = 'PASSIVE'):
+        """Checkpoint the WAL; call from idle time after write bursts.
+
+        Args:
+            mode: PASSIVE, FULL, RESTART or TRUNCATE
+        """
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Invalid checkpoint mode: {mode}")
+        with self._lock:
+            self._conn.execute(f'PRAGMA wal_checkpoint({mode})')
+
+    def close(self):
+        """Close the database connections."""
+        if self._conn is not None:
+            # Parting shots: refresh stale statistics and fold the WAL
+            # back into the main file so the sidecar files don't carry
+            # a restart's worth of growth
+            self._conn.execute('PRAGMA optimize')
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._conn.close()
+            self._conn = None
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _init_db(self):
         """Initialize database schema if it doesn't exist"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
+            with self._write():
+                cursor = self._conn.cursor()
 
                 # Create images metadata table
                 cursor.execute('''
@@ -44,55 +342,189 @@ class MetadataDatabase:
                     )
                 ''')
 
-                # Create tags table
+                # Create tags table. No created_at: nothing ever read it,
+                # and its CURRENT_TIMESTAMP default cost a time VFS call
+                # on every tag insert.
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS tags (
                         tag_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE NOT NULL,
-                        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                        name TEXT UNIQUE NOT NULL
                     )
                 ''')
 
-                # Create image_tags association table (many-to-many)
+                tag_cols = [r[1] for r in cursor.execute('PRAGMA table_info(tags)')]
+                if 'created_at' in tag_cols:
+                    cursor.execute('ALTER TABLE tags DROP COLUMN created_at')
+
+                # Create image_tags association table (many-to-many).
+                # Two integers with the PK as the only B-tree (WITHOUT
+                # ROWID) — the old shape repeated the full filename and
+                # an ISO timestamp on every association, several times
+                # the row width for data nothing ever read.
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS image_tags (
-                        image_filename TEXT NOT NULL,
+                        image_id INTEGER NOT NULL,
                         tag_id INTEGER NOT NULL,
-                        added_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                        PRIMARY KEY (image_filename, tag_id),
-                        FOREIGN KEY (image_filename) REFERENCES images(filename) ON DELETE CASCADE,
+                        PRIMARY KEY (image_id, tag_id),
+                        FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
                         FOREIGN KEY (tag_id) REFERENCES tags(tag_id) ON DELETE CASCADE
+                    ) WITHOUT ROWID
+                ''')
+
+                # One-time migration from the filename-keyed shape
+                cols = [r[1] for r in cursor.execute('PRAGMA table_info(image_tags)')]
+                if 'image_filename' in cols:
+                    cursor.execute('DROP TRIGGER IF EXISTS image_tags_fts_ai')
+                    cursor.execute('DROP TRIGGER IF EXISTS image_tags_fts_ad')
+                    cursor.execute('''
+                        CREATE TABLE image_tags_new (
+                            image_id INTEGER NOT NULL,
+                            tag_id INTEGER NOT NULL,
+                            PRIMARY KEY (image_id, tag_id),
+                            FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
+                            FOREIGN KEY (tag_id) REFERENCES tags(tag_id) ON DELETE CASCADE
+                        ) WITHOUT ROWID
+                    ''')
+                    cursor.execute('''
+                        INSERT OR IGNORE INTO image_tags_new (image_id, tag_id)
+                        SELECT i.id, it.tag_id
+                        FROM image_tags it
+                        JOIN images i ON i.filename = it.image_filename
+                    ''')
+                    cursor.execute('DROP TABLE image_tags')
+                    cursor.execute('ALTER TABLE image_tags_new RENAME TO image_tags')
+
+                # Create settings table for small key/value state such as
+                # the current holder of a singleton tag
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS settings (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                ''')
+
+                # Full-text index over title, description and tag names.
+                # LIKE '%query%' cannot use an index and scans every row;
+                # FTS5 MATCH is an inverted-index lookup. Kept in sync by
+                # the triggers below, so no write path needs changes.
+                # prefix= stores dedicated 2- and 3-char prefix indexes:
+                # search_images issues "q"* queries, and short prefixes
+                # are exactly what typeahead sends, so they resolve with
+                # one index probe instead of a term-range scan.
+                # Rebuild once if the table predates the prefix indexes.
+                row = cursor.execute('''
+                    SELECT sql FROM sqlite_master
+                    WHERE type = 'table' AND name = 'images_fts'
+                ''').fetchone()
+                if row and 'prefix=' not in row[0]:
+                    cursor.execute('DROP TABLE images_fts')
+
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(
+                        title, description, tags,
+                        tokenize='unicode61', prefix='2 3'
                     )
                 ''')
 
-                # Create indices for faster queries
                 cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_images_id ON images(id)
+                    CREATE TRIGGER IF NOT EXISTS images_fts_ai
+                    AFTER INSERT ON images BEGIN
+                        INSERT INTO images_fts (rowid, title, description, tags)
+                        VALUES (new.id, new.title, new.description, '');
+                    END
                 ''')
 
                 cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_images_filename ON images(filename)
+                    CREATE TRIGGER IF NOT EXISTS images_fts_au
+                    AFTER UPDATE OF title, description ON images BEGIN
+                        UPDATE images_fts SET title = new.title, description = new.description
+                        WHERE rowid = new.id;
+                    END
                 ''')
 
                 cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_images_uploaded_at ON images(uploaded_at)
+                    CREATE TRIGGER IF NOT EXISTS images_fts_ad
+                    AFTER DELETE ON images BEGIN
+                        DELETE FROM images_fts WHERE rowid = old.id;
+                    END
                 ''')
 
                 cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(name)
+                    CREATE TRIGGER IF NOT EXISTS image_tags_fts_ai
+                    AFTER INSERT ON image_tags BEGIN
+                        UPDATE images_fts SET tags = (
+                            SELECT IFNULL(group_concat(t.name, ' '), '')
+                            FROM image_tags it
+                            JOIN tags t ON t.tag_id = it.tag_id
+                            WHERE it.image_id = new.image_id
+                        )
+                        WHERE rowid = new.image_id;
+                    END
                 ''')
 
                 cursor.execute('''
-                    CREATE INDEX IF NOT EXISTS idx_image_tags_filename ON image_tags(image_filename)
+                    CREATE TRIGGER IF NOT EXISTS image_tags_fts_ad
+                    AFTER DELETE ON image_tags BEGIN
+                        UPDATE images_fts SET tags = (
+                            SELECT IFNULL(group_concat(t.name, ' '), '')
+                            FROM image_tags it
+                            JOIN tags t ON t.tag_id = it.tag_id
+                            WHERE it.image_id = old.image_id
+                        )
+                        WHERE rowid = old.image_id;
+                    END
                 ''')
 
+                # Backfill the index once for databases created before it
+                cursor.execute('''
+                    SELECT NOT EXISTS (SELECT 1 FROM images_fts)
+                           AND EXISTS (SELECT 1 FROM images)
+                ''')
+                if cursor.fetchone()[0]:
+                    cursor.execute('''
+                        INSERT INTO images_fts (rowid, title, description, tags)
+                        SELECT i.id, i.title, i.description,
+                               IFNULL((SELECT group_concat(t.name, ' ')
+                                       FROM image_tags it
+                                       JOIN tags t ON t.tag_id = it.tag_id
+                                       WHERE it.image_id = i.id), '')
+                        FROM images i
+                    ''')
+
+                # Create indices for faster queries. No extra index on
+                # images(id) or images(filename): id aliases the rowid,
+                # which has the table's own B-tree, and the filename
+                # UNIQUE constraint already maintains an automatic index.
+                # Duplicating them only doubled the page writes per
+                # insert, so drop the old ones from existing databases.
+                cursor.execute('DROP INDEX IF EXISTS idx_images_id')
+                cursor.execute('DROP INDEX IF EXISTS idx_images_filename')
+
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_images_uploaded_at ON images(uploaded_at)
+                ''')
+
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(name)
+                ''')
+
+                # The (image_id, tag_id) primary key already serves
+                # lookups by image, so only the tag_id probe needs an
+                # index of its own. In a WITHOUT ROWID table every index
+                # implicitly carries the primary-key columns, so this one
+                # is effectively (tag_id, image_id) — a covering index
+                # for get_images_by_tag, answered without touching the
+                # table ("SEARCH ... USING COVERING INDEX" in the plan).
                 cursor.execute('''
                     CREATE INDEX IF NOT EXISTS idx_image_tags_tag_id ON image_tags(tag_id)
                 ''')
 
-                conn.commit()
+                # Seed planner statistics so the first queries after a
+                # restart already get sensible join orders
+                cursor.execute('ANALYZE')
+
                 logger.info(f"Metadata database initialized at {self.db_path}")
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to initialize metadata database: {e}")
             raise
 
@@ -109,20 +541,128 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
+            with self._write():
+                # updated_at comes from SQLite itself; uploaded_at stays
+                # caller-supplied since it records an external event
+                self._conn.execute(_SQL_ADD_IMAGE, (filename, title, description, uploaded_at))
+            self._count_write()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to add image {filename} to metadata: {e}")
+            return False
 
-                cursor.execute('''
-                    INSERT OR REPLACE INTO images (filename, title, description, uploaded_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (filename, title, description, uploaded_at, datetime.now().isoformat()))
+    def add_images_bulk(self, images: List[tuple]) -> bool:
+        """Add multiple images to the metadata database in one transaction.
+
+        Args:
+            images: List of (filename, uploaded_at) tuples
 
-                conn.commit()
+        Returns:
+            True if successful, False otherwise
+        """
+        if not images:
             return True
-        except Exception as e:
-            logger.error(f"Failed to add image {filename} to metadata: {e}")
+        try:
+            with self._write():
+                self._conn.executemany(_SQL_ADD_IMAGE_BLANK, images)
+            self._count_write()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to bulk add {len(images)} images to metadata: {e}")
+            return False
+
+    def add_tags_bulk(self, pairs: List[tuple]) -> bool:
+        """Add many (filename, tag) associations in one transaction.
+
+        One fsync for the whole batch instead of one per add_tag call;
+        three statements total regardless of batch size.
+
+        Args:
+            pairs: List of (filename, tag_name) tuples
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not pairs:
+            return True
+        try:
+            with self._write():
+                cursor = self._conn.cursor()
+
+                # Create any missing tags, then resolve all ids at once
+                names = sorted({tag_name for _, tag_name in pairs})
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO tags (name) VALUES (?)',
+                    [(name,) for name in names]
+                )
+                placeholders = ','.join('?' * len(names))
+                cursor.execute(
+                    f'SELECT name, tag_id FROM tags WHERE name IN ({placeholders})',
+                    names
+                )
+                tag_ids = dict(cursor.fetchall())
+
+                cursor.executemany(
+                    _SQL_ADD_ASSOCIATION,
+                    [(filename, tag_ids[tag_name]) for filename, tag_name in pairs]
+                )
+            self._tag_id_cache.update(tag_ids)
+            self._count_write()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to bulk add {len(pairs)} tag associations: {e}")
             return False
 
+    def get_metadata_bulk(self, filenames: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get metadata for multiple images with two queries instead of one per file.
+
+        Args:
+            filenames: List of image filenames
+
+        Returns:
+            Dictionary mapping filename to its metadata dict (including tags).
+            Filenames without a database row are omitted.
+        """
+        if not filenames:
+            return {}
+        try:
+            with self._reader() as conn:
+                cursor = conn.cursor()
+
+                placeholders = ','.join('?' * len(filenames))
+
+                # Get image metadata for all requested files at once
+                cursor.execute(f'''
+                    SELECT filename, title, description, uploaded_at, created_at, updated_at
+                    FROM images
+                    WHERE filename IN ({placeholders})
+                ''', filenames)
+
+                result = {}
+                for row in cursor.fetchall():
+                    meta = dict(row)
+                    meta["tags"] = []
+                    result[meta["filename"]] = meta
+
+                # Get tags for all requested files in one joined query
+                cursor.execute(f'''
+                    SELECT i.filename, t.tag_id, t.name
+                    FROM images i
+                    JOIN image_tags it ON it.image_id = i.id
+                    JOIN tags t ON t.tag_id = it.tag_id
+                    WHERE i.filename IN ({placeholders})
+                    ORDER BY t.name
+                ''', filenames)
+
+                for filename, tag_id, name in cursor.fetchall():
+                    if filename in result:
+                        result[filename]["tags"].append({"tag_id": tag_id, "name": name})
+
+                return result
+        except sqlite3.Error as e:
+            logger.error(f"Failed to bulk get metadata for {len(filenames)} images: {e}")
+            return {}
+
     def remove_image(self, filename: str) -> bool:
         """Remove an image and its metadata from the database.
 
@@ -133,18 +673,46 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-
+            with self._write():
                 # Delete image and associated tags (cascading)
-                cursor.execute('DELETE FROM images WHERE filename = ?', (filename,))
-
-                conn.commit()
+                self._conn.execute(_SQL_REMOVE_IMAGE, (filename,))
+            self._count_write()
             return True
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to remove image {filename} from metadata: {e}")
             return False
 
+    def remove_images_bulk(self, filenames: List[str]) -> bool:
+        """Remove multiple images and their metadata in one transaction.
+
+        One DELETE statement (and one fsync for the whole batch) per
+        500-name chunk, instead of a transaction per file; the chunking
+        stays well under SQLite's bound-parameter limit.
+
+        Args:
+            filenames: List of image filenames to remove
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not filenames:
+            return True
+        try:
+            with self._write():
+                for i in range(0, len(filenames), 500):
+                    chunk = filenames[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    # Associated tags go with the images (cascading)
+                    self._conn.execute(
+                        f'DELETE FROM images WHERE filename IN ({placeholders})',
+                        chunk
+                    )
+            self._count_write()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to bulk remove {len(filenames)} images from metadata: {e}")
+            return False
+
     def get_image_metadata(self, filename: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific image.
 
@@ -155,41 +723,23 @@ class MetadataDatabase:
             Dictionary with image metadata including tags, or None if not found
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._reader() as conn:
                 cursor = conn.cursor()
 
                 # Get image metadata
-                cursor.execute('''
-                    SELECT filename, title, description, uploaded_at, created_at, updated_at
-                    FROM images
-                    WHERE filename = ?
-                ''', (filename,))
+                cursor.execute(_SQL_GET_IMAGE, (filename,))
 
                 row = cursor.fetchone()
                 if not row:
                     return None
 
                 # Get tags for this image
-                cursor.execute('''
-                    SELECT t.tag_id, t.name
-                    FROM tags t
-                    JOIN image_tags it ON t.tag_id = it.tag_id
-                    WHERE it.image_filename = ?
-                    ORDER BY t.name
-                ''', (filename,))
-
-                tags = [{"tag_id": tag[0], "name": tag[1]} for tag in cursor.fetchall()]
-
-                return {
-                    "filename": row[0],
-                    "title": row[1],
-                    "description": row[2],
-                    "uploaded_at": row[3],
-                    "created_at": row[4],
-                    "updated_at": row[5],
-                    "tags": tags
-                }
-        except Exception as e:
+                cursor.execute(_SQL_GET_IMAGE_TAGS, (filename,))
+
+                meta = dict(row)
+                meta["tags"] = [dict(tag) for tag in cursor.fetchall()]
+                return meta
+        except sqlite3.Error as e:
             logger.error(f"Failed to get metadata for {filename}: {e}")
             return None
 
@@ -205,29 +755,22 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-
-                # Build update query dynamically
-                updates = ["updated_at = ?"]
-                params = [datetime.now().isoformat()]
+            with self._write():
+                params = []
 
                 if title is not None:
-                    updates.append("title = ?")
                     params.append(title)
 
                 if description is not None:
-                    updates.append("description = ?")
                     params.append(description)
 
                 params.append(filename)
 
-                query = f"UPDATE images SET {', '.join(updates)} WHERE filename = ?"
-                cursor.execute(query, params)
-
-                conn.commit()
+                query = _UPDATE_QUERIES[(title is not None, description is not None)]
+                self._conn.execute(query, params)
+            self._count_write()
             return True
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to update metadata for {filename}: {e}")
             return False
 
@@ -242,25 +785,22 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-
-                # Insert or get tag
-                cursor.execute('INSERT OR IGNORE INTO tags (name) VALUES (?)', (tag_name,))
+            with self._write():
+                cursor = self._conn.cursor()
 
-                # Get tag_id
-                cursor.execute('SELECT tag_id FROM tags WHERE name = ?', (tag_name,))
+                # Upsert hands back the id whether the tag was inserted
+                # or already existed — one statement instead of
+                # INSERT OR IGNORE followed by a SELECT
+                cursor.execute(_SQL_UPSERT_TAG, (tag_name,))
                 tag_id = cursor.fetchone()[0]
 
                 # Add association
-                cursor.execute(
-                    'INSERT OR IGNORE INTO image_tags (image_filename, tag_id) VALUES (?, ?)',
-                    (filename, tag_id)
-                )
-
-                conn.commit()
+                cursor.execute(_SQL_ADD_ASSOCIATION, (filename, tag_id))
+            # After the commit, so a rollback can't leave a phantom id
+            self._tag_id_cache[tag_name] = tag_id
+            self._count_write()
             return True
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to add tag '{tag_name}' to {filename}: {e}")
             return False
 
@@ -275,24 +815,16 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-
-                # Get tag_id
-                cursor.execute('SELECT tag_id FROM tags WHERE name = ?', (tag_name,))
-                result = cursor.fetchone()
-
-                if not result:
-                    return False
-
-                tag_id = result[0]
+            tag_id = self._resolve_tag_id(tag_name)
+            if tag_id is None:
+                return False
 
+            with self._write():
                 # Remove association
-                cursor.execute('DELETE FROM image_tags WHERE image_filename = ? AND tag_id = ?', (filename, tag_id))
-
-                conn.commit()
+                self._conn.execute(_SQL_REMOVE_ASSOCIATION, (filename, tag_id))
+            self._count_write()
             return True
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to remove tag '{tag_name}' from {filename}: {e}")
             return False
 
@@ -306,25 +838,57 @@ class MetadataDatabase:
             True if successful, False otherwise
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
+            tag_id = self._resolve_tag_id(tag_name)
+            if tag_id is None:
+                return False
 
-                # Get tag_id
-                cursor.execute('SELECT tag_id FROM tags WHERE name = ?', (tag_name,))
-                result = cursor.fetchone()
+            with self._write():
+                # Remove associations for this tag from all images
+                self._conn.execute(_SQL_REMOVE_TAG_EVERYWHERE, (tag_id,))
+            self._count_write()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove tag '{tag_name}' from all images: {e}")
+            return False
 
-                if not result:
-                    return False
+    def get_singleton_tag_owner(self, tag_name: str) -> Optional[str]:
+        """Get the filename currently holding a singleton tag (e.g. 'latest').
 
-                tag_id = result[0]
+        Args:
+            tag_name: Singleton tag name
 
-                # Remove associations for this tag from all images
-                cursor.execute('DELETE FROM image_tags WHERE tag_id = ?', (tag_id,))
+        Returns:
+            Filename of the current holder, or None
+        """
+        try:
+            with self._reader() as conn:
+                row = conn.execute(
+                    _SQL_GET_SETTING, (f"singleton_tag:{tag_name}",)
+                ).fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get singleton tag owner for '{tag_name}': {e}")
+            return None
+
+    def set_singleton_tag_owner(self, tag_name: str, filename: str) -> bool:
+        """Record the filename holding a singleton tag.
+
+        Args:
+            tag_name: Singleton tag name
+            filename: Image filename now holding the tag
 
-                conn.commit()
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self._write():
+                self._conn.execute(
+                    _SQL_SET_SETTING, (f"singleton_tag:{tag_name}", filename)
+                )
+            self._count_write()
             return True
-        except Exception as e:
-            logger.error(f"Failed to remove tag '{tag_name}' from all images: {e}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set singleton tag owner for '{tag_name}': {e}")
             return False
 
     def get_all_tags(self) -> List[Dict[str, Any]]:
@@ -334,20 +898,13 @@ class MetadataDatabase:
             List of tag dictionaries with id and name
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._reader() as conn:
                 cursor = conn.cursor()
 
-                cursor.execute('''
-                    SELECT t.tag_id, t.name, COUNT(it.image_filename) as usage_count
-                    FROM tags t
-                    LEFT JOIN image_tags it ON t.tag_id = it.tag_id
-                    GROUP BY t.tag_id, t.name
-                    ORDER BY t.name
-                ''')
+                cursor.execute(_SQL_GET_ALL_TAGS)
 
-                result = [{"tag_id": row[0], "name": row[1], "usage_count": row[2]} for row in cursor.fetchall()]
-                return result
-        except Exception as e:
+                return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
             logger.error(f"Failed to get all tags: {e}")
             return []
 
@@ -361,20 +918,18 @@ class MetadataDatabase:
             List of filenames that have this tag
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            tag_id = self._resolve_tag_id(tag_name)
+            if tag_id is None:
+                return []
+
+            with self._reader() as conn:
                 cursor = conn.cursor()
 
-                cursor.execute('''
-                    SELECT DISTINCT it.image_filename
-                    FROM image_tags it
-                    JOIN tags t ON it.tag_id = t.tag_id
-                    WHERE t.name = ?
-                    ORDER BY it.image_filename
-                ''', (tag_name,))
+                cursor.execute(_SQL_IMAGES_BY_TAG, (tag_id,))
 
                 result = [row[0] for row in cursor.fetchall()]
                 return result
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to get images by tag '{tag_name}': {e}")
             return []
 
@@ -388,26 +943,64 @@ class MetadataDatabase:
             List of matching filenames
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
+            with self._reader() as conn:
                 cursor = conn.cursor()
 
-                search_pattern = f"%{query}%"
+                # Quote the query so FTS5 operators in user input can't
+                # break the syntax; the trailing * keeps the old
+                # match-anywhere feel for word prefixes
+                match = '"{}"*'.format(query.replace('"', '""'))
 
-                cursor.execute('''
-                    SELECT DISTINCT i.filename
-                    FROM images i
-                    LEFT JOIN image_tags it ON i.filename = it.image_filename
-                    LEFT JOIN tags t ON it.tag_id = t.tag_id
-                    WHERE i.title LIKE ? OR i.description LIKE ? OR t.name LIKE ?
-                    ORDER BY i.filename
-                ''', (search_pattern, search_pattern, search_pattern))
+                cursor.execute(_SQL_SEARCH, (match,))
 
                 result = [row[0] for row in cursor.fetchall()]
                 return result
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Failed to search images with query '{query}': {e}")
             return []
 
+    def iter_all_images_metadata(self):
+        """Yield metadata for all images, one image at a time.
+
+        Streams the flat JOIN in fetchmany batches instead of
+        materializing every image dict up front, so memory stays flat
+        for large catalogs and the first image is available before the
+        scan finishes. The pooled reader stays checked out until the
+        generator is exhausted or closed.
+
+        Yields:
+            Image metadata dictionaries (same shape as get_image_metadata)
+        """
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            # Rows per C-level fetch; amortizes the Python/SQLite boundary
+            cursor.arraysize = 256
+
+            cursor.execute(_SQL_ALL_IMAGES)
+
+            current = None
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    if current is None or current["filename"] != row[0]:
+                        if current is not None:
+                            yield current
+                        current = {
+                            "filename": row[0],
+                            "title": row[1],
+                            "description": row[2],
+                            "uploaded_at": row[3],
+                            "created_at": row[4],
+                            "updated_at": row[5],
+                            "tags": []
+                        }
+                    if row[6] is not None:
+                        current["tags"].append({"tag_id": row[6], "name": row[7]})
+            if current is not None:
+                yield current
+
     def get_all_images_metadata(self) -> List[Dict[str, Any]]:
         """Get metadata for all images.
 
@@ -415,39 +1008,7 @@ class MetadataDatabase:
             List of image metadata dictionaries
         """
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-
-                cursor.execute('''
-                    SELECT filename, title, description, uploaded_at, created_at, updated_at
-                    FROM images
-                    ORDER BY filename
-                ''')
-
-                images = []
-                for row in cursor.fetchall():
-                    # Get tags for each image
-                    cursor.execute('''
-                        SELECT t.tag_id, t.name
-                        FROM tags t
-                        JOIN image_tags it ON t.tag_id = it.tag_id
-                        WHERE it.image_filename = ?
-                        ORDER BY t.name
-                    ''', (row[0],))
-
-                    tags = [{"tag_id": tag[0], "name": tag[1]} for tag in cursor.fetchall()]
-
-                    images.append({
-                        "filename": row[0],
-                        "title": row[1],
-                        "description": row[2],
-                        "uploaded_at": row[3],
-                        "created_at": row[4],
-                        "updated_at": row[5],
-                        "tags": tags
-                    })
-
-                return images
-        except Exception as e:
+            return list(self.iter_all_images_metadata())
+        except sqlite3.Error as e:
             logger.error(f"Failed to get all images metadata: {e}")
             return []